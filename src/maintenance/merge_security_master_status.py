@@ -1,7 +1,6 @@
 import argparse
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple
 
 from src.maintenance.load_master_lists_to_db import get_db_config
@@ -14,6 +13,13 @@ logger = setup_logger("01_master_status_merge")
 SOURCE_PRIORITY = ["Financial Times", "Stock Analysis", "Yahoo Finance"]
 PLACEHOLDER_NULLS = {"", "--", "N/A", "NA", "NONE", "NULL", "NAN"}
 
+# Secondary keys ensure_table_exists adds to tables created before they existed.
+# MySQL has no partial indexes; leading with status gives the same effect, since every transition
+# predicate pins status first and the range then walks only that status' rows ordered by last_seen.
+STATUS_INDEXES = {
+    "idx_security_master_status_last_seen": "(status, last_seen)",
+}
+
 
 @dataclass
 class SecuritySnapshot:
@@ -68,12 +74,25 @@ def ensure_table_exists(cur) -> None:
           updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
           PRIMARY KEY (id),
           UNIQUE KEY uq_security_master_ticker (ticker),
-          KEY idx_security_master_status (status),
+          KEY idx_security_master_status_last_seen (status, last_seen),
           KEY idx_security_master_last_seen (last_seen)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """
     )
 
+    for index_name, columns in STATUS_INDEXES.items():
+        cur.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = 'stg_security_master'
+              AND index_name = %s
+            """,
+            (index_name,),
+        )
+        if cur.fetchone()[0] == 0:
+            cur.execute(f"ALTER TABLE stg_security_master ADD KEY {index_name} {columns}")
+
 
 def load_latest_source_rows(cur) -> List[Tuple[str, str, Optional[str], Optional[str], Optional[str]]]:
     # (source, ticker, name, ticker_type, url)
@@ -150,6 +169,62 @@ def build_snapshot(rows: List[Tuple[str, str, Optional[str], Optional[str], Opti
     return out
 
 
+# Shared predicates of the transition pre-count and UPDATE; the stale one binds inactive_days.
+_VALID_FIELDS_SQL = "ticker IS NOT NULL AND ticker <> '' AND name IS NOT NULL AND name <> ''"
+_STALE_SQL = "last_seen < CURRENT_DATE - INTERVAL %s DAY"
+
+
+def run_transitions(cur, inactive_days: int) -> Tuple[int, int, int]:
+    # Set-based status lifecycle in one UPDATE: a single pass over the candidate rows instead of three.
+    # The CASE arms reproduce the former sequential order (promote, then inactivate, then reactivate):
+    # a valid new row that is already stale still ends up inactive, and only rows matched by WHERE reach
+    # the later arms, so "new" there is always a valid row and "inactive" one seen today.
+    # Every date comparison uses the DB clock (CURRENT_DATE).
+    where_sql = f"""
+        WHERE (status=%s AND {_VALID_FIELDS_SQL})
+           OR (status=%s AND {_STALE_SQL})
+           OR (status=%s AND last_seen >= CURRENT_DATE)
+    """
+    where_params = (STATUS_NEW, STATUS_ACTIVE, inactive_days, STATUS_INACTIVE)
+
+    # Per-transition counts over the same rows, counted as the old sequential UPDATEs did;
+    # FOR UPDATE locks them so the UPDATE below changes exactly what was counted.
+    cur.execute(
+        f"""
+        SELECT
+            COALESCE(SUM(status=%s AND {_VALID_FIELDS_SQL}), 0),
+            COALESCE(SUM({_STALE_SQL} AND (status=%s OR (status=%s AND {_VALID_FIELDS_SQL}))), 0),
+            COALESCE(SUM(status=%s AND last_seen >= CURRENT_DATE), 0)
+        FROM stg_security_master
+        {where_sql}
+        FOR UPDATE
+        """,
+        (STATUS_NEW, inactive_days, STATUS_ACTIVE, STATUS_NEW, STATUS_INACTIVE) + where_params,
+    )
+    promoted, inactivated, reactivated = (int(n) for n in cur.fetchone())
+
+    cur.execute(
+        f"""
+        UPDATE stg_security_master
+        SET status = CASE
+                WHEN {_STALE_SQL} AND (status=%s OR (status=%s AND {_VALID_FIELDS_SQL})) THEN %s
+                WHEN status=%s THEN %s
+                WHEN status=%s THEN %s
+                ELSE status
+            END,
+            updated_at=CURRENT_TIMESTAMP
+        {where_sql}
+        """,
+        (
+            inactive_days, STATUS_ACTIVE, STATUS_NEW, STATUS_INACTIVE,
+            STATUS_NEW, STATUS_ACTIVE,
+            STATUS_INACTIVE, STATUS_ACTIVE,
+        )
+        + where_params,
+    )
+    return promoted, inactivated, reactivated
+
+
 def merge_security_master(inactive_days: int = 7) -> None:
     db = get_db_config()
     try:
@@ -166,11 +241,12 @@ def merge_security_master(inactive_days: int = 7) -> None:
         charset="utf8mb4",
         autocommit=False,
     )
-    today = datetime.now().strftime("%Y-%m-%d")
-    cutoff = (datetime.now() - timedelta(days=inactive_days)).strftime("%Y-%m-%d")
-
     try:
         with conn.cursor() as cur:
+            # first_seen/last_seen are stamped with the DB date, the same clock the transitions compare against.
+            cur.execute("SELECT CURRENT_DATE")
+            today = cur.fetchone()[0].strftime("%Y-%m-%d")
+
             ensure_table_exists(cur)
             source_rows = load_latest_source_rows(cur)
             snapshots = build_snapshot(source_rows, as_of=today)
@@ -207,40 +283,7 @@ def merge_security_master(inactive_days: int = 7) -> None:
                     ],
                 )
 
-            # Promote new -> active when basic fields are valid
-            cur.execute(
-                """
-                UPDATE stg_security_master
-                SET status=%s, updated_at=CURRENT_TIMESTAMP
-                WHERE status=%s
-                  AND ticker IS NOT NULL AND ticker <> ''
-                  AND name IS NOT NULL AND name <> ''
-                """,
-                (STATUS_ACTIVE, STATUS_NEW),
-            )
-            promoted_count = cur.rowcount
-
-            # Mark stale active rows inactive
-            cur.execute(
-                """
-                UPDATE stg_security_master
-                SET status=%s, updated_at=CURRENT_TIMESTAMP
-                WHERE status=%s AND last_seen < %s
-                """,
-                (STATUS_INACTIVE, STATUS_ACTIVE, cutoff),
-            )
-            inactivated_count = cur.rowcount
-
-            # Reactivate inactive rows seen again today
-            cur.execute(
-                """
-                UPDATE stg_security_master
-                SET status=%s, updated_at=CURRENT_TIMESTAMP
-                WHERE status=%s AND last_seen >= %s
-                """,
-                (STATUS_ACTIVE, STATUS_INACTIVE, today),
-            )
-            reactivated_count = cur.rowcount
+            promoted_count, inactivated_count, reactivated_count = run_transitions(cur, inactive_days=inactive_days)
 
             cur.execute(
                 """
@@ -223,7 +223,7 @@ async def run_scraper(headless: bool = True, sample: int = 0) -> None:
 
             logger.info("Navigating to screener page...")
             await page.goto(SCREENER_URL, wait_until="domcontentloaded", timeout=60000)
-            await mimic_reading(page, min_sec=2, max_sec=3)
+            await mimic_reading(page, min_sec=2, max_sec=3, headless=headless)
 
             if not await switch_to_all_indicators(page):
                 await browser.close()
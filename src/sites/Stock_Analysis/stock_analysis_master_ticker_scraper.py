@@ -174,7 +174,7 @@ async def run_scraper(headless: bool = True, sample: int = 0) -> None:
             except Exception:
                 pass
 
-            await mimic_reading(page, min_sec=2, max_sec=3)
+            await mimic_reading(page, min_sec=2, max_sec=3, headless=headless)
             if not await switch_to_all_indicators(page):
                 await browser.close()
                 log_execution_summary(logger, start_time=start_time, total_items=0, status="Failed")
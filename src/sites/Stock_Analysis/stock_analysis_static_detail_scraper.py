@@ -2,15 +2,14 @@ import argparse
 import asyncio
 import os
 import random
-import shutil
+import tempfile
 import time
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
-from playwright.async_api import async_playwright
 
-from src.utils.browser_utils import get_random_user_agent, mimic_reading
+from src.utils.browser_utils import close_shared_browser, get_random_user_agent, get_shared_browser, mimic_reading
 from src.utils.logger import log_execution_summary, setup_logger
 from src.utils.path_manager import VAL_SA_STATIC
 
@@ -264,21 +263,20 @@ async def run_sa_full_scraper(headless: bool = True) -> None:
     today_str = datetime.now().strftime("%Y-%m-%d")
     output_dir = VAL_SA_STATIC / today_str
     output_dir.mkdir(parents=True, exist_ok=True)
-    temp_dir = output_dir / "temp_downloads"
-    temp_dir.mkdir(exist_ok=True)
 
     success = False
     email = os.getenv("SA_EMAIL")
     password = os.getenv("SA_PASSWORD")
 
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=headless, args=["--start-maximized"])
-        context = await browser.new_context(viewport={"width": 1920, "height": 1080}, user_agent=get_random_user_agent())
-        page = await context.new_page()
+    browser = await get_shared_browser(headless=headless, args=["--start-maximized"])
+    context = await browser.new_context(viewport={"width": 1920, "height": 1080}, user_agent=get_random_user_agent())
+    page = await context.new_page()
 
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix="dl_", ignore_cleanup_errors=True) as td:
+        temp_dir = Path(td)
         try:
             if not await perform_login(page, email=email, password=password):
-                await browser.close()
+                await context.close()
                 log_execution_summary(logger, start_time=start_time, total_items=0, status="Failed")
                 return
 
@@ -289,15 +287,15 @@ async def run_sa_full_scraper(headless: bool = True) -> None:
             except Exception:
                 pass
 
-            await mimic_reading(page, min_sec=2, max_sec=3)
+            await mimic_reading(page, min_sec=2, max_sec=3, headless=headless)
 
             if not await switch_to_all_indicators(page):
-                await browser.close()
+                await context.close()
                 log_execution_summary(logger, start_time=start_time, total_items=0, status="Failed")
                 return
 
             csv_path, downloaded = await download_data(page, temp_dir)
-            await browser.close()
+            await context.close()
             if downloaded and csv_path:
                 success = process_csv_and_split(csv_path, output_dir)
                 try:
@@ -306,13 +304,7 @@ async def run_sa_full_scraper(headless: bool = True) -> None:
                     pass
         except Exception as exc:
             logger.error("Critical error: %s", exc)
-            await browser.close()
-
-    try:
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-    except Exception:
-        pass
+            await context.close()
 
     log_execution_summary(
         logger,
@@ -326,7 +318,14 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Stock Analysis static detail downloader and splitter")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
     args = parser.parse_args()
-    asyncio.run(run_sa_full_scraper(headless=args.headless))
+
+    async def _run() -> None:
+        try:
+            await run_sa_full_scraper(headless=args.headless)
+        finally:
+            await close_shared_browser()
+
+    asyncio.run(_run())
 
 
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 import argparse
 import asyncio
+import csv
 import math
+import os
+import pickle
 import random
 import re
 import sys
 import time
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -12,12 +16,20 @@ from typing import Dict, List, Optional
 import pandas as pd
 from playwright.async_api import async_playwright
 
+from src.sites.Yahoo_Finance.yahoo_finance_static_common import route_minimal_assets_keep_css
 from src.utils.logger import setup_logger
 from src.utils.path_manager import VAL_YF_DIR, VAL_YF_HOLDINGS
 
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+else:
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
 
 
 logger = setup_logger("04_holdings_yf_master")
@@ -30,16 +42,131 @@ DIR_SECTORS = BASE_OUTPUT_DIR / "Sectors"
 DIR_ALLOCATION = BASE_OUTPUT_DIR / "Allocation"
 MISSING_REPORT_FILE = BASE_OUTPUT_DIR / "yf_holdings_missing_report.csv"
 PROCESSED_REPORT_FILE = BASE_OUTPUT_DIR / "yf_holdings_processed_report.csv"
+PROCESSED_KEYS_CACHE_FILE = BASE_OUTPUT_DIR / ".processed_keys.pkl"
+PLAYWRIGHT_PROFILE_DIR = BASE_OUTPUT_DIR / ".pw_profile"
 
 for directory in [DIR_HOLDINGS, DIR_SECTORS, DIR_ALLOCATION]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Pulls every section the scraper reads in one CDP round-trip instead of a
+# locator.count()/inner_text() call per row.
+_EXTRACT_HOLDINGS_JS = """
+() => {
+    const texts = (section) =>
+        section ? Array.from(section.querySelectorAll('div[class*="content"]')).map((el) => el.innerText) : [];
+    const tables = Array.from(document.querySelectorAll("table")).map((table) => {
+        const rows = Array.from(table.querySelectorAll("tbody tr"));
+        return {
+            first: rows.length ? rows[0].innerText : "",
+            rows: rows.map((tr) => Array.from(tr.querySelectorAll("td")).map((td) => td.innerText)),
+        };
+    });
+    return {
+        holdings: texts(document.querySelector('section[data-testid="top-holdings"]')),
+        sectors: texts(document.querySelector('section[data-testid*="sector-weightings"]')),
+        tables: tables,
+    };
+}
+"""
+
+
+CONTENT_READY_SELECTOR = 'section[data-testid="top-holdings"], section[data-testid*="sector-weightings"], table'
+
+
+def _scrape_holdings(data: Dict) -> List[Dict[str, str]]:
+    holdings_data = []
+    for text in data.get("holdings") or []:
+        parts = text.split("\n")
+        if len(parts) >= 3:
+            holdings_data.append({"symbol": parts[1], "name": parts[0], "value": parts[-1]})
+        elif len(parts) == 2:
+            holdings_data.append({"symbol": "-", "name": parts[0], "value": parts[1]})
+    if holdings_data:
+        return holdings_data
+
+    for table in data.get("tables") or []:
+        rows = table["rows"]
+        if not rows:
+            continue
+        first_row = table["first"]
+        if "Symbol" in first_row or "% Assets" in first_row:
+            for cols in rows:
+                if len(cols) >= 3:
+                    holdings_data.append({"symbol": cols[0], "name": cols[1], "value": cols[2]})
+            if holdings_data:
+                break
+    return holdings_data
+
 
-async def _route_minimal_assets(route):
-    if route.request.resource_type in {"image", "font", "media"}:
-        await route.abort()
-    else:
-        await route.continue_()
+def _scrape_sectors(data: Dict) -> List[Dict[str, str]]:
+    sector_data = []
+    for text in data.get("sectors") or []:
+        parts = text.split("\n")
+        if len(parts) >= 2:
+            sector_data.append({"sector": parts[0], "value": parts[-1]})
+    return sector_data
+
+
+def _scrape_allocation(data: Dict) -> List[Dict[str, str]]:
+    allocation_data = []
+    for table in data.get("tables") or []:
+        rows = table["rows"]
+        if not rows:
+            continue
+        first_cell = rows[0][0] if rows[0] else ""
+        if any(k in first_cell for k in ["Cash", "Stocks", "Bonds"]):
+            for cols in rows:
+                if len(cols) >= 2:
+                    allocation_data.append({"category": cols[0], "value": cols[1]})
+            if allocation_data:
+                break
+    return allocation_data
+
+
+# Clicks every known consent/close control in one round-trip. ":has-text()" is
+# Playwright-only, so the text-labelled buttons are matched in JS instead.
+_DISMISS_POPUPS_JS = """
+() => {
+    const selectors = [
+        'button[name="reject"]',
+        'button[name="agree"]',
+        'button[value="agree"]',
+        'button[aria-label="Close"]',
+        "button.close",
+        "div.ox-close",
+        "#consent-page button.reject",
+    ];
+    const labels = ["Maybe later", "Not now"];
+    const click = (el) => {
+        try {
+            el.click();
+        } catch (e) {}
+    };
+    selectors.forEach((sel) => {
+        const el = document.querySelector(sel);
+        if (el) click(el);
+    });
+    document.querySelectorAll("button").forEach((el) => {
+        if (labels.some((label) => (el.textContent || "").includes(label))) click(el);
+    });
+}
+"""
+
+
+_QUOTE_RE = re.compile(r"/quote/([^/?]+)")
+_ASSET_DEL = str.maketrans("", "", "/ ")
+
+
+def _normalize_asset(asset_type) -> str:
+    return str(asset_type or "Fund").strip().upper().translate(_ASSET_DEL)
+
+
+def _scan_stems(directory: Path, suffix: str) -> List[str]:
+    try:
+        with os.scandir(directory) as it:
+            return [entry.name[: -len(suffix)] for entry in it if entry.name.endswith(suffix)]
+    except OSError:
+        return []
 
 
 def _load_tickers_from_db() -> Optional[List[Dict[str, str]]]:
@@ -80,20 +207,20 @@ def _load_tickers_from_master() -> List[Dict[str, str]]:
         return []
 
     try:
-        df = pd.read_csv(master_file, encoding="utf-8-sig")
+        master_parquet = master_file.with_suffix(".parquet")
+        if master_parquet.exists():
+            df = pd.read_parquet(master_parquet, columns=["ticker", "ticker_type"])
+        else:
+            df = pd.read_csv(master_file, encoding="utf-8-sig")
         if "ticker" not in df.columns:
             return []
         if "ticker_type" not in df.columns:
             df["ticker_type"] = "Fund"
 
-        output: List[Dict[str, str]] = []
-        for _, row in df.iterrows():
-            ticker = str(row.get("ticker", "")).strip()
-            if not ticker:
-                continue
-            asset_type = str(row.get("ticker_type", "Fund") or "Fund")
-            output.append({"ticker": ticker, "asset_type": asset_type})
-        return output
+        df["ticker"] = df["ticker"].fillna("").astype(str).str.strip()
+        df["ticker_type"] = df["ticker_type"].fillna("Fund").astype(str).replace("", "Fund")
+        df = df[df["ticker"] != ""]
+        return df.rename(columns={"ticker_type": "asset_type"})[["ticker", "asset_type"]].to_dict("records")
     except Exception:
         return []
 
@@ -128,12 +255,8 @@ class YFHoldingsScraper:
         self.pause_max_sec = max(self.pause_min_sec, float(pause_max_sec))
         self.per_ticker_timeout_sec = max(30, int(per_ticker_timeout_sec))
 
-        logger.info("Fetching active Yahoo Finance tickers...")
-        self.tickers = get_ticker_universe()
-        if sample > 0:
-            self.tickers = self.tickers[:sample]
-
-        logger.info("Total tickers to process: %s", len(self.tickers))
+        self.sample = max(0, int(sample))
+        self.tickers: List[Dict[str, str]] = []
 
         self.total_processed = 0
         self.total_success = 0
@@ -144,34 +267,59 @@ class YFHoldingsScraper:
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0",
         ]
 
-        if not MISSING_REPORT_FILE.exists():
-            pd.DataFrame(columns=["ticker", "asset_type", "reason", "timestamp"]).to_csv(
-                MISSING_REPORT_FILE,
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not PROCESSED_REPORT_FILE.exists():
-            pd.DataFrame(columns=["ticker", "asset_type", "status", "updated_at"]).to_csv(
-                PROCESSED_REPORT_FILE,
-                index=False,
-                encoding="utf-8-sig",
-            )
+        self._missing_fh = open(MISSING_REPORT_FILE, "a", newline="", encoding="utf-8-sig")
+        self._missing_writer = csv.writer(self._missing_fh)
+        if self._missing_fh.tell() == 0:
+            self._missing_writer.writerow(["ticker", "asset_type", "reason", "timestamp"])
+            self._missing_fh.flush()
+        self._missing_lock = asyncio.Lock()
+        self._missing_buffer: List[List[str]] = []
+        self._timestamp_sec = 0
+        self._timestamp_str = ""
+
+        self._processed_fh = open(PROCESSED_REPORT_FILE, "a", newline="", encoding="utf-8-sig")
+        self._processed_writer = csv.writer(self._processed_fh)
+        if self._processed_fh.tell() == 0:
+            self._processed_writer.writerow(["ticker", "asset_type", "status", "updated_at"])
+            self._processed_fh.flush()
+        self._checkpoint_cache = PROCESSED_KEYS_CACHE_FILE
+
+    def _checkpoint_signature(self) -> tuple:
+        signature = []
+        for path in [PROCESSED_REPORT_FILE, DIR_HOLDINGS, DIR_SECTORS, DIR_ALLOCATION]:
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
 
     def _load_processed_keys(self) -> set[str]:
+        # Reuse the last computed set while the report and output dirs are unchanged.
+        signature = self._checkpoint_signature()
+        try:
+            with self._checkpoint_cache.open("rb") as f:
+                cached = pickle.load(f)
+            if cached.get("key") == signature:
+                return cached["set"]
+        except Exception:
+            pass
+
         processed: set[str] = set()
         try:
             if not PROCESSED_REPORT_FILE.exists() or PROCESSED_REPORT_FILE.stat().st_size == 0:
                 pass
             else:
-                df = pd.read_csv(PROCESSED_REPORT_FILE, encoding="utf-8-sig")
-                # Terminal states for current-day resumability.
+                # Terminal states for current-day resumability. Nothing emits SKIPPED any more; it stays
+                # listed only so reports written by older runs still resume correctly.
                 terminal = {"SUCCESS", "NO_DATA", "INVALID_TICKER", "SKIPPED"}
-                df = df[df["status"].astype(str).str.upper().isin(terminal)]
-                processed |= {
-                f"{str(r['ticker']).strip().upper()}|{str(r['asset_type']).strip().upper()}"
-                for _, r in df.iterrows()
-                if str(r.get("ticker", "")).strip()
-                }
+                with open(PROCESSED_REPORT_FILE, "r", encoding="utf-8-sig", newline="") as f:
+                    for row in csv.DictReader(f):
+                        if (row.get("status") or "").upper() not in terminal:
+                            continue
+                        ticker = (row.get("ticker") or "").strip().upper()
+                        if ticker:
+                            processed.add(f"{ticker}|{(row.get('asset_type') or '').strip().upper()}")
         except Exception:
             pass
 
@@ -181,61 +329,67 @@ class YFHoldingsScraper:
             (DIR_SECTORS, "_sectors.csv"),
             (DIR_ALLOCATION, "_allocation.csv"),
         ]:
-            if not directory.exists():
-                continue
-            for p in directory.glob(f"*{suffix}"):
-                stem = p.name[: -len(suffix)]
-                parts = stem.rsplit("_", 1)
-                if len(parts) == 2:
-                    ticker_part, asset_part = parts
-                    ticker = ticker_part.replace("_", "/").upper()
-                    asset = asset_part.upper()
-                    processed.add(f"{ticker}|{asset}")
+            parts_list = [stem.rsplit("_", 1) for stem in _scan_stems(directory, suffix)]
+            processed.update(
+                f"{parts[0].replace('_', '/').upper()}|{parts[1].upper()}" for parts in parts_list if len(parts) == 2
+            )
+
+        try:
+            with self._checkpoint_cache.open("wb") as f:
+                pickle.dump({"key": signature, "set": processed}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            pass
         return processed
 
     def _append_processed(self, rows: List[Dict[str, str]]) -> None:
         if not rows:
             return
-        pd.DataFrame(rows).to_csv(PROCESSED_REPORT_FILE, mode="a", header=False, index=False, encoding="utf-8-sig")
+        self._processed_writer.writerows(
+            [row["ticker"], row["asset_type"], row["status"], row["updated_at"]] for row in rows
+        )
+        self._processed_fh.flush()
+
+    def _timestamp(self) -> str:
+        now = int(time.time())
+        if now != self._timestamp_sec:
+            self._timestamp_sec = now
+            self._timestamp_str = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        return self._timestamp_str
+
+    def _flush_missing(self) -> None:
+        if not self._missing_buffer:
+            return
+        self._missing_writer.writerows(self._missing_buffer)
+        self._missing_fh.flush()
+        self._missing_buffer.clear()
+
+    async def aclose(self) -> None:
+        async with self._missing_lock:
+            self._flush_missing()
+            self._missing_fh.close()
+        self._processed_fh.close()
 
     def get_random_ua(self) -> str:
         return random.choice(self.user_agents)
 
     async def log_missing(self, ticker: str, asset_type: str, reason: str) -> None:
         try:
-            pd.DataFrame(
-                [
-                    {
-                        "ticker": ticker,
-                        "asset_type": asset_type,
-                        "reason": reason,
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
-                ]
-            ).to_csv(MISSING_REPORT_FILE, mode="a", header=False, index=False, encoding="utf-8-sig")
+            async with self._missing_lock:
+                self._missing_buffer.append([ticker, asset_type, reason, self._timestamp()])
         except Exception:
             pass
 
     async def dismiss_popups(self, page) -> None:
         try:
             await page.keyboard.press("Escape")
-            selectors = [
-                'button[name="reject"]',
-                'button[name="agree"]',
-                'button[value="agree"]',
-                'button[aria-label="Close"]',
-                "button.close",
-                "div.ox-close",
-                "#consent-page button.reject",
-                'button:has-text("Maybe later")',
-                'button:has-text("Not now")',
-            ]
-            for selector in selectors:
-                if await page.locator(selector).count() > 0:
-                    try:
-                        await page.locator(selector).first.click(force=True, timeout=500)
-                    except Exception:
-                        pass
+            await page.evaluate(_DISMISS_POPUPS_JS)
+        except Exception:
+            pass
+
+    async def _wait_for_content(self, page) -> None:
+        # Navigation returns on commit; only block until a section we scrape is in the DOM.
+        try:
+            await page.wait_for_selector(CONTENT_READY_SELECTOR, timeout=15000)
         except Exception:
             pass
 
@@ -251,7 +405,7 @@ class YFHoldingsScraper:
                     pass
 
                 if "/quote/" in page.url and "lookup" not in page.url:
-                    match = re.search(r"/quote/([^/?]+)", page.url)
+                    match = _QUOTE_RE.search(page.url)
                     if match:
                         return match.group(1)
                     return ticker
@@ -259,10 +413,117 @@ class YFHoldingsScraper:
             pass
         return None
 
-    async def process_ticker(self, context, item: Dict[str, str]) -> str:
+    async def _fill_page_pool(self, context, page_pool: asyncio.Queue) -> None:
+        # A persistent context starts with one blank page; reuse it as a pool slot.
+        pages = list(context.pages)[: self.concurrency]
+        while len(pages) < self.concurrency:
+            pages.append(await context.new_page())
+        for page in pages:
+            page_pool.put_nowait(page)
+
+    async def _worker(self, queue: asyncio.Queue, page_pool: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                page = await page_pool.get()
+                try:
+                    status = await asyncio.wait_for(
+                        self.process_ticker(page, item),
+                        timeout=self.per_ticker_timeout_sec,
+                    )
+                except asyncio.TimeoutError:
+                    ticker = str(item.get("ticker", "")).strip()
+                    asset_type = str(item.get("asset_type", "Fund") or "Fund")
+                    await self.log_missing(ticker, asset_type, f"TIMEOUT>{self.per_ticker_timeout_sec}s")
+                    status = "TIMEOUT"
+                finally:
+                    page_pool.put_nowait(page)
+
+                self._completed.append((item, status))
+                async with self._batch_lock:
+                    if len(self._completed) >= self.batch_size:
+                        try:
+                            await self._finish_batch(page_pool)
+                        except Exception as exc:
+                            logger.error("Batch bookkeeping failed: %s", exc)
+            finally:
+                queue.task_done()
+
+    async def _finish_batch(self, page_pool: Optional[asyncio.Queue] = None) -> None:
+        batch = self._completed[: self.batch_size]
+        del self._completed[: self.batch_size]
+        if not batch:
+            return
+
+        now_s = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        processed_rows = []
+        for item, status in batch:
+            processed_rows.append(
+                {
+                    "ticker": str(item.get("ticker", "")).strip(),
+                    "asset_type": _normalize_asset(item.get("asset_type")),
+                    "status": status,
+                    "updated_at": now_s,
+                }
+            )
+        self._append_processed(processed_rows)
+        async with self._missing_lock:
+            self._flush_missing()
+
+        # process_ticker yields SUCCESS / NO_DATA / INVALID_TICKER, and the worker adds TIMEOUT.
+        counts = Counter(status for _, status in batch)
+        success_count = counts["SUCCESS"]
+        self.total_success += success_count
+        self.total_processed += len(batch)
+        self._batch_index += 1
+
+        duration = time.time() - self._batch_start
+        self._batch_start = time.time()
+        logger.info(
+            "Batch %s/%s | Saved=%s | NoData=%s | Invalid=%s | Timeout=%s | Progress=%s/%s | Time=%.2fs | Concurrency=%s",
+            self._batch_index,
+            self._total_batches,
+            success_count,
+            counts["NO_DATA"],
+            counts["INVALID_TICKER"],
+            counts["TIMEOUT"],
+            self.total_processed,
+            self._total_pending,
+            duration,
+            self.concurrency,
+        )
+
+        if page_pool is None:
+            return
+
+        # Periodically swap in fresh pages and cool down to reduce block risk. Cookies stay: the
+        # persistent profile exists to keep the consent cookies, and clearing them brings the popups back.
+        recycle = self._batch_index % 10 == 0
+        pause = self.pause_every_batches > 0 and self._batch_index % self.pause_every_batches == 0
+        if not (recycle or pause):
+            return
+
+        # Holding every pooled page parks the other workers until we are done.
+        held = [await page_pool.get() for _ in range(self.concurrency)]
+        try:
+            if recycle:
+                # Open the replacements first so the persistent context never drops to zero pages.
+                fresh = [await self._context.new_page() for _ in held]
+                for page in held:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                held = fresh
+            if pause:
+                await asyncio.sleep(random.uniform(self.pause_min_sec, self.pause_max_sec))
+        finally:
+            for page in held:
+                page_pool.put_nowait(page)
+
+    async def process_ticker(self, page, item: Dict[str, str]) -> str:
         ticker = item["ticker"]
-        raw_asset_type = item.get("asset_type", "Fund") or "Fund"
-        asset_type = str(raw_asset_type).upper().replace("/", "").replace(" ", "")
+        asset_type = _normalize_asset(item.get("asset_type"))
 
         safe_ticker = ticker.replace("/", "_").replace(":", "_")
 
@@ -270,121 +531,65 @@ class YFHoldingsScraper:
         file_sectors = DIR_SECTORS / f"{safe_ticker}_{asset_type}_sectors.csv"
         file_allocation = DIR_ALLOCATION / f"{safe_ticker}_{asset_type}_allocation.csv"
 
-        if file_holdings.exists() or file_sectors.exists() or file_allocation.exists():
-            return "SKIPPED"
-
-        page = await context.new_page()
         target_ticker = ticker
+        today = datetime.now().strftime("%Y-%m-%d")
         url = f"https://finance.yahoo.com/quote/{target_ticker}/holdings/"
 
         data_found = False
 
         try:
             await asyncio.sleep(random.uniform(self.min_wait_sec, self.max_wait_sec))
-            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            await page.goto(url, timeout=60000, wait_until="commit")
+            await self._wait_for_content(page)
 
             if "lookup" in page.url:
                 new_ticker = await self.search_fallback(page, ticker)
                 if new_ticker:
                     target_ticker = new_ticker
-                    await page.goto(f"https://finance.yahoo.com/quote/{target_ticker}/holdings/", timeout=60000)
+                    await page.goto(
+                        f"https://finance.yahoo.com/quote/{target_ticker}/holdings/",
+                        timeout=60000,
+                        wait_until="commit",
+                    )
+                    await self._wait_for_content(page)
                 else:
-                    await page.close()
                     await self.log_missing(ticker, asset_type, "INVALID_TICKER (Search Failed)")
                     return "INVALID_TICKER"
 
             if "lookup" in page.url:
-                await page.close()
                 await self.log_missing(ticker, asset_type, "INVALID_TICKER (Still Lookup)")
                 return "INVALID_TICKER"
 
             await asyncio.sleep(random.uniform(self.min_wait_sec, self.max_wait_sec))
             await self.dismiss_popups(page)
 
-            holdings_data = []
-            section = page.locator('section[data-testid="top-holdings"]')
-            if await section.count() > 0:
-                rows = section.locator('div[class*="content"]')
-                count = await rows.count()
-                for i in range(count):
-                    text = await rows.nth(i).inner_text()
-                    parts = text.split("\n")
-                    if len(parts) >= 3:
-                        holdings_data.append({"symbol": parts[1], "name": parts[0], "value": parts[-1]})
-                    elif len(parts) == 2:
-                        holdings_data.append({"symbol": "-", "name": parts[0], "value": parts[1]})
-
-            if not holdings_data:
-                tables = page.locator("table")
-                table_count = await tables.count()
-                for i in range(table_count):
-                    rows = tables.nth(i).locator("tbody tr")
-                    if await rows.count() == 0:
-                        continue
-                    first_row = await rows.nth(0).inner_text()
-                    if "Symbol" in first_row or "% Assets" in first_row:
-                        for r in range(await rows.count()):
-                            cols = rows.nth(r).locator("td")
-                            if await cols.count() >= 3:
-                                symbol = await cols.nth(0).inner_text()
-                                name = await cols.nth(1).inner_text()
-                                value = await cols.nth(2).inner_text()
-                                holdings_data.append({"symbol": symbol, "name": name, "value": value})
-                        if holdings_data:
-                            break
+            data = await page.evaluate(_EXTRACT_HOLDINGS_JS)
+            holdings_data = _scrape_holdings(data)
+            sector_data = _scrape_sectors(data)
+            allocation_data = _scrape_allocation(data)
 
             if holdings_data:
-                df_holdings = pd.DataFrame(holdings_data)
-                df_holdings["ticker"] = ticker
-                df_holdings["yahoo_ticker"] = target_ticker
-                df_holdings["asset_type"] = asset_type
-                df_holdings["updated_at"] = datetime.now().strftime("%Y-%m-%d")
-                df_holdings.to_csv(file_holdings, index=False, encoding="utf-8-sig")
+                with open(file_holdings, "w", newline="", encoding="utf-8-sig") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["symbol", "name", "value", "ticker", "yahoo_ticker", "asset_type", "updated_at"])
+                    writer.writerows(
+                        [h["symbol"], h["name"], h["value"], ticker, target_ticker, asset_type, today]
+                        for h in holdings_data
+                    )
                 data_found = True
 
-            sector_data = []
-            section_sector = page.locator('section[data-testid*="sector-weightings"]')
-            if await section_sector.count() > 0:
-                rows = section_sector.locator('div[class*="content"]')
-                count = await rows.count()
-                for i in range(count):
-                    text = await rows.nth(i).inner_text()
-                    parts = text.split("\n")
-                    if len(parts) >= 2:
-                        sector_data.append({"sector": parts[0], "value": parts[-1]})
-
             if sector_data:
-                df_sector = pd.DataFrame(sector_data)
-                df_sector["ticker"] = ticker
-                df_sector["asset_type"] = asset_type
-                df_sector["updated_at"] = datetime.now().strftime("%Y-%m-%d")
-                df_sector.to_csv(file_sectors, index=False, encoding="utf-8-sig")
+                with open(file_sectors, "w", newline="", encoding="utf-8-sig") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["sector", "value", "ticker", "asset_type", "updated_at"])
+                    writer.writerows([r["sector"], r["value"], ticker, asset_type, today] for r in sector_data)
                 data_found = True
 
-            allocation_data = []
-            tables = page.locator("table")
-            table_count = await tables.count()
-            for i in range(table_count):
-                rows = tables.nth(i).locator("tbody tr")
-                if await rows.count() == 0:
-                    continue
-                first_cell = await rows.nth(0).locator("td").first.inner_text()
-                if any(k in first_cell for k in ["Cash", "Stocks", "Bonds"]):
-                    for r in range(await rows.count()):
-                        cols = rows.nth(r).locator("td")
-                        if await cols.count() >= 2:
-                            category = await cols.nth(0).inner_text()
-                            value = await cols.nth(1).inner_text()
-                            allocation_data.append({"category": category, "value": value})
-                    if allocation_data:
-                        break
-
             if allocation_data:
-                df_allocation = pd.DataFrame(allocation_data)
-                df_allocation["ticker"] = ticker
-                df_allocation["asset_type"] = asset_type
-                df_allocation["updated_at"] = datetime.now().strftime("%Y-%m-%d")
-                df_allocation.to_csv(file_allocation, index=False, encoding="utf-8-sig")
+                with open(file_allocation, "w", newline="", encoding="utf-8-sig") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["category", "value", "ticker", "asset_type", "updated_at"])
+                    writer.writerows([r["category"], r["value"], ticker, asset_type, today] for r in allocation_data)
                 data_found = True
 
             if not data_found:
@@ -392,25 +597,62 @@ class YFHoldingsScraper:
 
         except Exception as exc:
             await self.log_missing(ticker, asset_type, f"ERROR: {str(exc)[:50]}")
-        finally:
-            await page.close()
 
         return "SUCCESS" if data_found else "NO_DATA"
 
+    def _load_tickers(self) -> List[Dict[str, str]]:
+        logger.info("Fetching active Yahoo Finance tickers...")
+        tickers = get_ticker_universe()
+        if self.sample > 0:
+            tickers = tickers[: self.sample]
+        logger.info("Total tickers to process: %s", len(tickers))
+        return tickers
+
+    async def _launch_context(self, playwright):
+        # Persistent profile keeps Yahoo consent cookies across runs.
+        context = await playwright.chromium.launch_persistent_context(
+            user_data_dir=str(PLAYWRIGHT_PROFILE_DIR),
+            headless=True,
+            viewport={"width": 1280, "height": 800},
+            user_agent=self.get_random_ua(),
+        )
+        await context.route("**/*", route_minimal_assets_keep_css)
+        return context
+
     async def run(self) -> None:
+        try:
+            async with async_playwright() as playwright:
+                # Ticker/checkpoint IO is independent of browser start-up, so overlap them.
+                # Output files already on disk are folded into the checkpoint keys, so
+                # process_ticker does not need to stat them again per ticker.
+                self.tickers, processed_keys, self._context = await asyncio.gather(
+                    asyncio.to_thread(self._load_tickers),
+                    asyncio.to_thread(self._load_processed_keys),
+                    self._launch_context(playwright),
+                )
+                try:
+                    await self._scrape_pending(processed_keys)
+                finally:
+                    await self._context.close()
+        finally:
+            await self.aclose()
+
+    async def _scrape_pending(self, processed_keys: set[str]) -> None:
         if not self.tickers:
             return
 
         logger.info("Starting Yahoo holdings scraper")
-        processed_keys = self._load_processed_keys()
+        queued_keys: set[str] = set()
         pending: List[Dict[str, str]] = []
         for item in self.tickers:
             ticker = str(item.get("ticker", "")).strip().upper()
-            asset_type = str(item.get("asset_type", "Fund") or "Fund").strip().upper().replace("/", "").replace(" ", "")
+            asset_type = _normalize_asset(item.get("asset_type"))
             if not ticker:
                 continue
-            if f"{ticker}|{asset_type}" in processed_keys:
+            key = f"{ticker}|{asset_type}"
+            if key in processed_keys or key in queued_keys:
                 continue
+            queued_keys.add(key)
             pending.append(item)
         logger.info("Resume checkpoint: processed=%s | remaining=%s", len(processed_keys), len(pending))
         self.tickers = pending
@@ -419,72 +661,30 @@ class YFHoldingsScraper:
         if total == 0:
             logger.info("All tickers already processed (checkpoint).")
             return
-        batches = math.ceil(total / self.batch_size)
-
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context(viewport={"width": 1280, "height": 800}, user_agent=self.get_random_ua())
-            await context.route("**/*", _route_minimal_assets)
-
-            for i in range(batches):
-                batch_start = time.time()
-                batch = self.tickers[i * self.batch_size : (i + 1) * self.batch_size]
+        self._total_pending = total
+        self._total_batches = math.ceil(total / self.batch_size)
+        self._batch_index = 0
+        self._batch_start = time.time()
+        self._completed: List[tuple] = []
+        self._batch_lock = asyncio.Lock()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in self.tickers:
+            queue.put_nowait(item)
 
-                sem = asyncio.Semaphore(self.concurrency)
+        page_pool: asyncio.Queue = asyncio.Queue()
+        await self._fill_page_pool(self._context, page_pool)
 
-                async def run_one(item):
-                    async with sem:
-                        try:
-                            return await asyncio.wait_for(
-                                self.process_ticker(context, item),
-                                timeout=self.per_ticker_timeout_sec,
-                            )
-                        except asyncio.TimeoutError:
-                            ticker = str(item.get("ticker", "")).strip()
-                            asset_type = str(item.get("asset_type", "Fund") or "Fund")
-                            await self.log_missing(ticker, asset_type, f"TIMEOUT>{self.per_ticker_timeout_sec}s")
-                            return "TIMEOUT"
-
-                results = await asyncio.gather(*[run_one(item) for item in batch])
-                processed_rows = []
-                for item, status in zip(batch, results):
-                    processed_rows.append(
-                        {
-                            "ticker": str(item.get("ticker", "")).strip(),
-                            "asset_type": str(item.get("asset_type", "Fund") or "Fund").strip().upper().replace("/", "").replace(" ", ""),
-                            "status": status,
-                            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        }
-                    )
-                self._append_processed(processed_rows)
-
-                success_count = results.count("SUCCESS")
-                skipped_count = results.count("SKIPPED")
-                self.total_success += success_count
-                self.total_processed += len(batch)
-
-                duration = time.time() - batch_start
-                logger.info(
-                    "Batch %s/%s | Saved=%s | Skips=%s | Progress=%s/%s | Time=%.2fs | Concurrency=%s",
-                    i + 1,
-                    batches,
-                    success_count,
-                    skipped_count,
-                    self.total_processed,
-                    total,
-                    duration,
-                    self.concurrency,
-                )
-
-                # Periodically recycle context and cool down to reduce block risk.
-                if (i + 1) % 10 == 0:
-                    await context.close()
-                    context = await browser.new_context(viewport={"width": 1280, "height": 800}, user_agent=self.get_random_ua())
-                    await context.route("**/*", _route_minimal_assets)
-                if self.pause_every_batches > 0 and (i + 1) % self.pause_every_batches == 0:
-                    await asyncio.sleep(random.uniform(self.pause_min_sec, self.pause_max_sec))
+        workers = [asyncio.create_task(self._worker(queue, page_pool)) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-            await browser.close()
+        while self._completed:
+            await self._finish_batch()
 
         logger.info("Finished. Total saved tickers: %s", self.total_success)
         logger.info("Missing report: %s", MISSING_REPORT_FILE)
@@ -1,14 +1,17 @@
 import asyncio
 import csv
 import logging
+import operator
+import os
 import random
 import re
+import string
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from bs4 import BeautifulSoup
+import pandas as pd
 from playwright.async_api import async_playwright
 
 from src.utils.browser_utils import get_context_options, get_launch_args
@@ -30,6 +33,28 @@ class YahooFinanceMasterConfig:
 
 CSV_HEADERS = ["ticker", "name", "ticker_type", "source", "date_scraper", "url"]
 
+_TOTAL_RE = re.compile(r"of\s+([\d,]+)\s+results")
+_TICKER_CHARS = string.ascii_letters + string.digits + ".-"
+_QUOTE_LINK_SELECTOR = ", ".join(
+    f'{row} a[href*="/quote/"]' for row in ("table tbody tr", 'div[data-testid="list-item"]', "tr.simpTblRow")
+)
+
+# Runs in the page and ships back only the quote-link fields extract_full_table_data needs.
+_EXTRACT_QUOTE_LINKS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), (a) => {
+    const row = a.closest('tr, div[data-testid="list-item"]');
+    const span = row ? row.querySelector('span[title]') : null;
+    // Last-resort name: text of the row's second direct td/div column.
+    const columns = row ? Array.from(row.children).filter((el) => el.tagName === 'TD' || el.tagName === 'DIV') : [];
+    return {
+        href: a.getAttribute('href') || '',
+        text: (a.textContent || '').trim(),
+        title: a.getAttribute('title') || a.getAttribute('aria-label') || (span && span.getAttribute('title')) || '',
+        column: columns.length > 1 ? (columns[1].textContent || '').trim() : '',
+    };
+})
+"""
+
 ETF_MARKETS_URLS = {
     "Most_Active": "https://finance.yahoo.com/markets/etfs/most-active/",
     "Top_Gainers": "https://finance.yahoo.com/markets/etfs/gainers/",
@@ -67,7 +92,6 @@ async def human_sleep(min_sec: float = 0.5, max_sec: float = 1.5) -> None:
 async def dismiss_popups(page) -> None:
     try:
         await page.keyboard.press("Escape")
-        await asyncio.sleep(0.2)
     except Exception:
         pass
 
@@ -83,112 +107,88 @@ async def dismiss_popups(page) -> None:
 
     for selector in selectors:
         try:
-            if await page.locator(selector).count() > 0:
-                await page.locator(selector).first.click(force=True)
-                await asyncio.sleep(0.5)
+            locator = page.locator(selector).first
+            if await locator.count() > 0:
+                await locator.click(force=True)
+                # Wait for the overlay to go away rather than sleeping a fixed half second.
+                await locator.wait_for(state="hidden", timeout=1000)
         except Exception:
             continue
 
 
 async def get_website_total_count(page) -> int:
     try:
-        content = await page.content()
-        soup = BeautifulSoup(content, "lxml")
-        matches = soup.find_all(string=re.compile(r"of\s+[\d,]+\s+results"))
-        for text in matches:
-            numbers = re.findall(r"of\s+([\d,]+)\s+results", text)
-            if numbers:
-                return int(numbers[0].replace(",", ""))
-        return 0
+        body_text = await page.evaluate("() => document.body ? document.body.innerText : ''")
+        match = _TOTAL_RE.search(body_text)
+        return int(match.group(1).replace(",", "")) if match else 0
     except Exception:
         return 0
 
 
-def extract_full_table_data(soup: BeautifulSoup, ticker_type_label: str) -> List[Dict]:
-    extracted: List[Dict] = []
+def _is_valid_ticker(text: str) -> bool:
+    # strip() with the allowed alphabet leaves nothing exactly when every char is allowed; one C call per row.
+    return 0 < len(text) < 15 and not text.strip(_TICKER_CHARS) and not text.isdigit()
 
-    rows = soup.select("table tbody tr")
-    if not rows:
-        rows = soup.select('div[data-testid="list-item"]')
-    if not rows:
-        rows = soup.select("tr.simpTblRow")
+
+def extract_full_table_data(links: List[Dict], ticker_type_label: str) -> List[Dict]:
+    extracted: List[Dict] = []
+    seen = set()
 
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    for row in rows:
-        ticker_text = ""
-        name_text = ""
-        url = ""
-
-        link = row.find("a", href=lambda x: x and "/quote/" in x)
-        if link:
-            href = link.get("href", "")
-            url = f"https://finance.yahoo.com{href}" if href.startswith("/") else href
-
-            candidate_ticker = link.get_text(strip=True).split(" ")[0]
-            if not candidate_ticker and "/quote/" in href:
-                parts = href.split("/quote/")
-                if len(parts) > 1:
-                    candidate_ticker = parts[1].split("?")[0].split("/")[0]
-
-            ticker_text = candidate_ticker
-
-            if link.get("title"):
-                name_text = link.get("title").strip()
-            elif link.get("aria-label"):
-                name_text = link.get("aria-label").strip()
-            else:
-                name_span = row.find("span", title=True)
-                if name_span:
-                    name_text = name_span.get("title").strip()
-                else:
-                    columns = row.find_all(["td", "div"], recursive=False)
-                    if len(columns) > 1:
-                        name_text = columns[1].get_text(strip=True)
-
-        if ticker_text and not ticker_text.isdigit() and len(ticker_text) < 15 and re.match(r"^[A-Z0-9.\-]+$", ticker_text, re.IGNORECASE):
-            if not name_text:
-                name_text = "N/A"
-
-            extracted.append(
-                {
-                    "ticker": ticker_text,
-                    "name": name_text,
-                    "ticker_type": ticker_type_label,
-                    "source": "Yahoo Finance",
-                    "date_scraper": current_date,
-                    "url": url,
-                }
-            )
+    for link in links:
+        href = link["href"]
+        url = f"https://finance.yahoo.com{href}" if href.startswith("/") else href
+
+        words = link["text"].split()
+        ticker_text = words[0] if words else href.split("/quote/", 1)[1].split("?")[0].split("/")[0]
+        if ticker_text in seen or not _is_valid_ticker(ticker_text):
+            continue
+        seen.add(ticker_text)
+
+        extracted.append(
+            {
+                "ticker": ticker_text,
+                "name": link["title"].strip() or link["column"] or "N/A",
+                "ticker_type": ticker_type_label,
+                "source": "Yahoo Finance",
+                "date_scraper": current_date,
+                "url": url,
+            }
+        )
 
     return extracted
 
 
+async def new_category_context(browser):
+    context_options = get_context_options()
+    context_options["user_agent"] = get_random_user_agent()
+    context_options["viewport"] = {"width": 1280, "height": 800}
+
+    context = await browser.new_context(**context_options)
+    await context.route(
+        "**/*",
+        lambda route: route.abort() if route.request.resource_type in ["image", "media", "font"] else route.continue_(),
+    )
+    return context
+
+
 async def scrape_single_category(
-    semaphore: asyncio.Semaphore,
-    browser,
+    context_pool: asyncio.Queue,
     asset_key: str,
     category_name: str,
     url_template: str,
     cfg: YahooFinanceMasterConfig,
-) -> Tuple[str, str, List[Dict], int]:
-    async with semaphore:
+) -> Tuple[str, str, Dict[str, Dict], int]:
+    # The pool holds concurrent_limit contexts, so it also bounds concurrency.
+    context = await context_pool.get()
+    try:
         await human_sleep(0.5, 1.5)
 
-        items: List[Dict] = []
-        seen_tickers = set()
+        # Keyed on ticker so cross-page dedup is a dict insert and run() can merge with update().
+        items: Dict[str, Dict] = {}
         website_total = 0
 
-        context_options = get_context_options()
-        context_options["user_agent"] = get_random_user_agent()
-        context_options["viewport"] = {"width": 1280, "height": 800}
-
-        context = await browser.new_context(**context_options)
-        await context.route(
-            "**/*",
-            lambda route: route.abort() if route.request.resource_type in ["image", "media", "font"] else route.continue_(),
-        )
-
         page = await context.new_page()
         start_index = 0
         max_limit = cfg.max_pages_to_check * cfg.items_per_page
@@ -217,9 +217,11 @@ async def scrape_single_category(
                             website_total = await get_website_total_count(page)
                             if website_total > 0:
                                 logger.info("[%s] web total: %s", category_name, f"{website_total:,}")
+                                # No page starting at or past the advertised total can hold new rows.
+                                max_limit = min(max_limit, website_total)
 
-                        content = await page.content()
-                        new_items = extract_full_table_data(BeautifulSoup(content, "lxml"), asset_key)
+                        links = await page.evaluate(_EXTRACT_QUOTE_LINKS_JS, _QUOTE_LINK_SELECTOR)
+                        new_items = extract_full_table_data(links, asset_key)
                         success = True
                     except Exception:
                         retry += 1
@@ -228,15 +230,11 @@ async def scrape_single_category(
                 if not new_items:
                     break
 
-                added = 0
+                before = len(items)
                 for item in new_items:
-                    ticker = item["ticker"]
-                    if ticker not in seen_tickers:
-                        seen_tickers.add(ticker)
-                        items.append(item)
-                        added += 1
+                    items.setdefault(item["ticker"], item)
 
-                if added == 0:
+                if len(items) == before or (website_total > 0 and len(items) >= website_total):
                     break
 
                 start_index += cfg.items_per_page
@@ -247,9 +245,14 @@ async def scrape_single_category(
         except Exception as exc:
             logger.error("error in [%s]: %s", category_name, exc)
         finally:
-            await context.close()
+            try:
+                await page.close()
+            except Exception:
+                pass
 
         return asset_key, category_name, items, website_total
+    finally:
+        context_pool.put_nowait(context)
 
 
 async def run(cfg: YahooFinanceMasterConfig) -> None:
@@ -263,24 +266,27 @@ async def run(cfg: YahooFinanceMasterConfig) -> None:
             def as_completed(tasks, **kwargs):
                 return asyncio.as_completed(tasks)
 
-    semaphore = asyncio.Semaphore(cfg.concurrent_limit)
-
     async with async_playwright() as playwright:
         launch_options = get_launch_args(headless=True)
         browser = await playwright.chromium.launch(**launch_options)
 
+        context_pool: asyncio.Queue = asyncio.Queue()
+        contexts = [await new_category_context(browser) for _ in range(cfg.concurrent_limit)]
+        for context in contexts:
+            context_pool.put_nowait(context)
+
         tasks = []
         for category, url in ETF_MARKETS_URLS.items():
-            tasks.append(scrape_single_category(semaphore, browser, "ETF", category, url, cfg))
+            tasks.append(scrape_single_category(context_pool, "ETF", category, url, cfg))
         for category, url in MUTUAL_FUND_MARKETS_URLS.items():
-            tasks.append(scrape_single_category(semaphore, browser, "Fund", category, url, cfg))
+            tasks.append(scrape_single_category(context_pool, "Fund", category, url, cfg))
 
-        all_raw_items: List[Dict] = []
+        unique_dict: Dict[str, Dict] = {}
         audit_report = []
 
         for future in tqdm.as_completed(tasks, desc="Scraping", total=len(tasks)):
             asset_key, category_name, items, web_total = await future
-            all_raw_items.extend(items)
+            unique_dict.update(items)
 
             status = "OK"
             if web_total > 0 and len(items) < (web_total * 0.8) and len(items) < 2000:
@@ -295,11 +301,12 @@ async def run(cfg: YahooFinanceMasterConfig) -> None:
                 }
             )
 
+        for context in contexts:
+            await context.close()
         await browser.close()
 
     today_str = datetime.now().strftime("%Y-%m-%d")
-    unique_dict = {item["ticker"]: item for item in all_raw_items}
-    unique_list = sorted(unique_dict.values(), key=lambda x: x["ticker"])
+    unique_list = sorted(unique_dict.values(), key=operator.itemgetter("ticker"))
 
     save_path = cfg.output_dir / today_str / "yf_ticker.csv"
     save_path.parent.mkdir(parents=True, exist_ok=True)
@@ -311,6 +318,19 @@ async def run(cfg: YahooFinanceMasterConfig) -> None:
 
     logger.info("Saved %s tickers -> %s", f"{len(unique_list):,}", save_path)
 
+    # Columnar sibling so downstream loaders can read just the columns they need without CSV parsing.
+    # Loaders prefer the parquet when it exists, so it is swapped in atomically and removed if the write fails;
+    # an earlier same-day parquet must never sit next to a fresher CSV.
+    parquet_path = save_path.with_suffix(".parquet")
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    try:
+        pd.DataFrame(unique_list, columns=CSV_HEADERS).to_parquet(tmp_path, compression="zstd", index=False)
+        os.replace(tmp_path, parquet_path)
+    except Exception as exc:
+        logger.warning("Parquet copy skipped: %s", exc)
+        tmp_path.unlink(missing_ok=True)
+        parquet_path.unlink(missing_ok=True)
+
     print("\n" + "=" * 60)
     print(f"{'Category':<35} | {'Web':>8} | {'Got':>8} | {'Status'}")
     print("-" * 60)
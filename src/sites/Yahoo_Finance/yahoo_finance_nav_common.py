@@ -1,14 +1,19 @@
 import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
 import yfinance as yf
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 
 from src.utils.logger import setup_logger
 from src.utils.path_manager import DATA_PERFORMANCE_DIR, VAL_YF_DIR
@@ -21,6 +26,23 @@ LOGGER_MAP = {
 
 SOURCE_NAME = "Yahoo Finance"
 
+USER_AGENTS = [
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+]
+
+QUOTE_API_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+# The quote endpoint rejects cookie-less calls ("Invalid Crumb"); these two URLs give the session a crumb first.
+QUOTE_COOKIE_URL = "https://fc.yahoo.com"
+QUOTE_CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+QUOTE_BATCH_LIMIT = 200
+
+HTTP_CACHE_FILE = DATA_PERFORMANCE_DIR / "yf_http_cache"
+HTTP_CACHE_TTL_SEC = 3600
+
+# One keep-alive session per thread; yfinance may call in from its own threads.
+_thread_local = threading.local()
+
 
 @dataclass
 class YahooFinanceNavConfig:
@@ -47,15 +69,29 @@ class YahooFinanceNavConfig:
         return self.output_dir / f"yf_errors_{self.asset_type.lower()}.csv"
 
 
-def get_custom_session() -> requests.Session:
-    session = requests.Session()
-    user_agents = [
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    ]
+def _http_cache_expiry() -> int:
+    # Never let a cached quote page outlive the scrape date it was fetched for.
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, min(HTTP_CACHE_TTL_SEC, int((midnight - now).total_seconds())))
+
+
+def get_custom_session(cached: bool = False) -> requests.Session:
+    if cached:
+        HTTP_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        session = CachedSession(
+            cache_name=str(HTTP_CACHE_FILE),
+            backend="sqlite",
+            expire_after=_http_cache_expiry(),
+            allowable_methods=("GET",),
+            allowable_codes=(200,),
+        )
+    else:
+        session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
     session.headers.update(
         {
-            "User-Agent": random.choice(user_agents),
+            "User-Agent": random.choice(USER_AGENTS),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
         }
@@ -63,11 +99,20 @@ def get_custom_session() -> requests.Session:
     return session
 
 
+def get_shared_session(cached: bool = False) -> requests.Session:
+    attr = "cached_session" if cached else "session"
+    session = getattr(_thread_local, attr, None)
+    if session is None:
+        session = get_custom_session(cached=cached)
+        setattr(_thread_local, attr, session)
+    return session
+
+
 def get_processed_tickers(output_file: Path) -> Set[str]:
     if not output_file.exists():
         return set()
     try:
-        df = pd.read_csv(output_file, usecols=["ticker"])
+        df = pd.read_csv(output_file, usecols=["ticker"], dtype={"ticker": str}, engine="pyarrow")
         return set(df["ticker"].astype(str).str.strip().tolist())
     except Exception:
         return set()
@@ -101,10 +146,20 @@ def _fetch_tickers_from_latest_master(asset_type: str) -> List[str]:
     if not latest_master.exists():
         return []
 
+    latest_parquet = latest_master.with_suffix(".parquet")
     try:
-        df = pd.read_csv(latest_master, encoding="utf-8-sig")
+        if latest_parquet.exists():
+            df = pd.read_parquet(latest_parquet, columns=["ticker", "ticker_type"])
+        else:
+            df = pd.read_csv(
+                latest_master,
+                usecols=["ticker", "ticker_type"],
+                dtype=str,
+                encoding="utf-8-sig",
+                engine="pyarrow",
+            )
         filtered = df[df["ticker_type"].astype(str).str.upper() == asset_type.upper()]
-        return filtered["ticker"].astype(str).str.strip().dropna().unique().tolist()
+        return filtered["ticker"].dropna().astype(str).str.strip().str.upper().unique().tolist()
     except Exception:
         return []
 
@@ -112,24 +167,95 @@ def _fetch_tickers_from_latest_master(asset_type: str) -> List[str]:
 def get_target_tickers(asset_type: str) -> List[str]:
     db_tickers = _fetch_tickers_from_db(SOURCE_NAME, asset_type)
     if db_tickers is not None:
-        return db_tickers
-    return _fetch_tickers_from_latest_master(asset_type)
+        return list(dict.fromkeys(db_tickers))
+    return list(dict.fromkeys(_fetch_tickers_from_latest_master(asset_type)))
+
+
+def _quote_to_result(quote: Dict, cfg: YahooFinanceNavConfig) -> Optional[Dict]:
+    price = quote.get("regularMarketPrice")
+    if price is None:
+        return None
+    market_time = quote.get("regularMarketTime")
+    return {
+        "ticker": quote.get("symbol"),
+        "asset_type": cfg.asset_type,
+        "source": SOURCE_NAME,
+        "nav_price": float(price),
+        "currency": quote.get("currency") or "USD",
+        "as_of_date": datetime.fromtimestamp(market_time).strftime("%Y-%m-%d") if market_time else cfg.current_date,
+        "scrape_date": cfg.current_date,
+    }
+
+
+def _get_crumb(session: requests.Session) -> Optional[str]:
+    # Same handshake yfinance does: fc.yahoo.com sets the A3 cookie, getcrumb returns the token bound to it.
+    # The outcome is kept per thread; "" means the handshake failed and the quote endpoint is skipped.
+    crumb = getattr(_thread_local, "crumb", None)
+    if crumb is None:
+        crumb = ""
+        try:
+            session.get(QUOTE_COOKIE_URL, timeout=10)
+            response = session.get(QUOTE_CRUMB_URL, headers={"User-Agent": session.headers["User-Agent"]}, timeout=10)
+            text = response.text.strip()
+            if response.status_code == 200 and text and "<" not in text:
+                crumb = text
+        except Exception:
+            pass
+        _thread_local.crumb = crumb
+    return crumb or None
+
+
+def _fetch_quotes(tickers: List[str], cfg: YahooFinanceNavConfig) -> Dict[str, Dict]:
+    session = get_shared_session()
+    crumb = _get_crumb(session)
+    if crumb is None:
+        return {}
+
+    # The quote endpoint takes a comma-joined symbol list and answers in one small JSON body.
+    response = session.get(
+        QUOTE_API_URL,
+        params={"symbols": ",".join(tickers), "crumb": crumb},
+        headers={"User-Agent": session.headers["User-Agent"], "Accept": "application/json"},
+        timeout=10,
+    )
+    if response.status_code in (401, 403):
+        # Crumb rejected: stop paying for this call for the rest of the run; yf.download covers the batch.
+        _thread_local.crumb = ""
+        return {}
+    if response.status_code != 200:
+        return {}
+
+    results: Dict[str, Dict] = {}
+    payload = orjson.loads(response.content)
+    for quote in (payload.get("quoteResponse") or {}).get("result") or []:
+        result = _quote_to_result(quote, cfg)
+        if result and result["ticker"]:
+            results[result["ticker"]] = result
+    return results
+
+
+def fetch_via_quote_api(ticker: str, cfg: YahooFinanceNavConfig) -> Optional[Dict]:
+    try:
+        return _fetch_quotes([ticker], cfg).get(ticker)
+    except Exception:
+        return None
 
 
 def fetch_via_web_scraping(ticker: str, cfg: YahooFinanceNavConfig) -> Optional[Dict]:
     url = f"https://finance.yahoo.com/quote/{ticker}"
     try:
-        response = get_custom_session().get(url, timeout=10)
+        response = get_shared_session(cached=True).get(url, headers={"User-Agent": random.choice(USER_AGENTS)}, timeout=10)
         if response.status_code != 200:
             return None
 
-        soup = BeautifulSoup(response.text, "lxml")
-        price_tag = soup.find("fin-streamer", {"data-field": "regularMarketPrice"})
+        tree = HTMLParser(response.text)
+        price_tag = tree.css_first('fin-streamer[data-field="regularMarketPrice"]')
         if not price_tag:
-            price_tag = soup.find("fin-streamer", {"data-field": "regularMarketOpen"})
+            price_tag = tree.css_first('fin-streamer[data-field="regularMarketOpen"]')
 
-        if price_tag and price_tag.text:
-            raw_price = price_tag.text.replace(",", "").strip()
+        price_text = price_tag.text() if price_tag else ""
+        if price_text:
+            raw_price = price_text.replace(",", "").strip()
             nav_price = float(raw_price)
             return {
                 "ticker": ticker,
@@ -146,10 +272,10 @@ def fetch_via_web_scraping(ticker: str, cfg: YahooFinanceNavConfig) -> Optional[
     return None
 
 
-def fetch_single_ticker_retry(ticker: str, cfg: YahooFinanceNavConfig) -> Optional[Dict]:
+def fetch_single_ticker_retry(ticker: str, cfg: YahooFinanceNavConfig, use_quote_api: bool = True) -> Optional[Dict]:
     try:
         time.sleep(random.uniform(0.5, 1.0))
-        ticker_data = yf.Ticker(ticker, session=get_custom_session())
+        ticker_data = yf.Ticker(ticker, session=get_shared_session())
         history = ticker_data.history(period="5d")
 
         if not history.empty:
@@ -167,6 +293,10 @@ def fetch_single_ticker_retry(ticker: str, cfg: YahooFinanceNavConfig) -> Option
     except Exception:
         pass
 
+    if use_quote_api:
+        result = fetch_via_quote_api(ticker, cfg)
+        if result:
+            return result
     return fetch_via_web_scraping(ticker, cfg)
 
 
@@ -175,43 +305,55 @@ def fetch_batch_data(tickers: List[str], cfg: YahooFinanceNavConfig):
     failed_candidates = []
     need_cool_down = False
 
-    try:
-        tickers_str = " ".join(tickers)
-        data = yf.download(tickers_str, period="1mo", group_by="ticker", threads=True, progress=False)
-
-        for ticker in tickers:
-            try:
-                frame = data if len(tickers) == 1 else (data[ticker] if ticker in data else pd.DataFrame())
-                valid = False
-                if not frame.empty and "Close" in frame.columns:
-                    last_valid = frame["Close"].dropna().tail(1)
-                    if not last_valid.empty:
-                        results.append(
-                            {
-                                "ticker": ticker,
-                                "asset_type": cfg.asset_type,
-                                "source": SOURCE_NAME,
-                                "nav_price": float(last_valid.iloc[0]),
-                                "currency": "USD",
-                                "as_of_date": last_valid.index[0].strftime("%Y-%m-%d"),
-                                "scrape_date": cfg.current_date,
-                            }
-                        )
-                        valid = True
-                if not valid:
+    # Happy path: one quote API call per QUOTE_BATCH_LIMIT symbols returns just the last price.
+    quoted: Dict[str, Dict] = {}
+    for i in range(0, len(tickers), QUOTE_BATCH_LIMIT):
+        try:
+            quoted.update(_fetch_quotes(tickers[i : i + QUOTE_BATCH_LIMIT], cfg))
+        except Exception:
+            pass
+    results.extend(quoted[t] for t in tickers if t in quoted)
+    missing = [t for t in tickers if t not in quoted]
+
+    if missing:
+        try:
+            data = yf.download(" ".join(missing), period="1mo", group_by="ticker", threads=True, progress=False)
+
+            for ticker in missing:
+                try:
+                    frame = data if len(missing) == 1 else (data[ticker] if ticker in data else pd.DataFrame())
+                    valid = False
+                    if not frame.empty and "Close" in frame.columns:
+                        last_valid = frame["Close"].dropna().tail(1)
+                        if not last_valid.empty:
+                            results.append(
+                                {
+                                    "ticker": ticker,
+                                    "asset_type": cfg.asset_type,
+                                    "source": SOURCE_NAME,
+                                    "nav_price": float(last_valid.iloc[0]),
+                                    "currency": "USD",
+                                    "as_of_date": last_valid.index[0].strftime("%Y-%m-%d"),
+                                    "scrape_date": cfg.current_date,
+                                }
+                            )
+                            valid = True
+                    if not valid:
+                        failed_candidates.append(ticker)
+                except Exception:
                     failed_candidates.append(ticker)
-            except Exception:
-                failed_candidates.append(ticker)
-    except Exception:
-        failed_candidates = tickers
+        except Exception:
+            failed_candidates = missing
 
     real_fails = []
     if failed_candidates:
         if len(failed_candidates) > (len(tickers) * 0.5):
             need_cool_down = True
 
+        # If the batch quote call returned nothing, a per-ticker quote call would fail the same way.
+        quote_api_ok = bool(quoted)
         for ticker in failed_candidates:
-            result = fetch_single_ticker_retry(ticker, cfg)
+            result = fetch_single_ticker_retry(ticker, cfg, use_quote_api=quote_api_ok)
             if result:
                 results.append(result)
             else:
@@ -232,6 +374,11 @@ def _try_insert_dataframe(df: pd.DataFrame) -> None:
         pass
 
 
+def _append_csv(path: Path, rows: List[Dict]) -> None:
+    if rows:
+        pd.DataFrame(rows).to_csv(path, mode="a", header=not path.exists(), index=False)
+
+
 def run_nav_scraper(cfg: YahooFinanceNavConfig) -> None:
     logger = setup_logger(LOGGER_MAP.get(cfg.asset_type.upper(), "02_perf_yf_nav"))
     start_time = time.time()
@@ -247,7 +394,7 @@ def run_nav_scraper(cfg: YahooFinanceNavConfig) -> None:
         return
 
     processed_tickers = get_processed_tickers(cfg.output_file)
-    todos = [t for t in target_tickers if t not in processed_tickers]
+    todos = list(dict.fromkeys(t for t in target_tickers if t not in processed_tickers))
 
     logger.info("Summary total=%s skipped=%s remaining=%s", len(target_tickers), len(processed_tickers), len(todos))
 
@@ -258,53 +405,49 @@ def run_nav_scraper(cfg: YahooFinanceNavConfig) -> None:
     success_count = 0
     fail_count = 0
 
-    for i in range(0, len(todos), cfg.batch_size):
-        batch = todos[i : i + cfg.batch_size]
-        results, fails, need_cool_down = fetch_batch_data(batch, cfg)
-
-        if results:
-            result_df = pd.DataFrame(results)
-            _try_insert_dataframe(result_df)
-            result_df.to_csv(
-                cfg.output_file,
-                mode="a",
-                header=not cfg.output_file.exists(),
-                index=False,
-            )
-            success_count += len(results)
-
-        if fails:
-            error_df = pd.DataFrame(
-                {
-                    "ticker": fails,
-                    "reason": "Failed L3 Scraping",
-                    "scraped_at": datetime.now(),
-                }
-            )
-            error_df.to_csv(
-                cfg.error_file,
-                mode="a",
-                header=not cfg.error_file.exists(),
-                index=False,
+    # One background writer: CSV appends overlap the inter-batch sleep and the next download.
+    # Each batch is appended in the same iteration as its DB insert, so the CSV (the resume source)
+    # never lags the table and a killed run does not re-insert batches already in the DB.
+    writer = ThreadPoolExecutor(max_workers=1)
+    writes = []
+
+    try:
+        for i in range(0, len(todos), cfg.batch_size):
+            batch = todos[i : i + cfg.batch_size]
+            results, fails, need_cool_down = fetch_batch_data(batch, cfg)
+
+            if results:
+                _try_insert_dataframe(pd.DataFrame(results))
+                writes.append(writer.submit(_append_csv, cfg.output_file, results))
+                success_count += len(results)
+
+            if fails:
+                scraped_at = datetime.now()
+                fail_rows = [{"ticker": t, "reason": "Failed L3 Scraping", "scraped_at": scraped_at} for t in fails]
+                writes.append(writer.submit(_append_csv, cfg.error_file, fail_rows))
+                fail_count += len(fails)
+
+            current_batch = i // cfg.batch_size + 1
+            total_batches = (len(todos) // cfg.batch_size) + 1
+            logger.info(
+                "Batch %s/%s | OK=%s | FAIL=%s | TotalSuccess=%s",
+                current_batch,
+                total_batches,
+                len(results),
+                len(fails),
+                success_count,
             )
-            fail_count += len(fails)
-
-        current_batch = i // cfg.batch_size + 1
-        total_batches = (len(todos) // cfg.batch_size) + 1
-        logger.info(
-            "Batch %s/%s | OK=%s | FAIL=%s | TotalSuccess=%s",
-            current_batch,
-            total_batches,
-            len(results),
-            len(fails),
-            success_count,
-        )
 
-        if need_cool_down:
-            logger.warning("Cool Down Mode: sleeping %ss", cfg.cool_down_delay_sec)
-            time.sleep(cfg.cool_down_delay_sec)
-        else:
-            time.sleep(cfg.normal_delay_sec)
+            if need_cool_down:
+                logger.warning("Cool Down Mode: sleeping %ss", cfg.cool_down_delay_sec)
+                time.sleep(cfg.cool_down_delay_sec)
+            else:
+                time.sleep(cfg.normal_delay_sec)
+    finally:
+        writer.shutdown(wait=True)
+
+    for write in writes:
+        write.result()
 
     total_duration = time.time() - start_time
     logger.info("=" * 50)
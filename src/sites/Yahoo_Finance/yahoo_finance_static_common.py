@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import csv
+import logging
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from playwright.async_api import async_playwright
+
+from src.utils.browser_utils import get_random_headers
+from src.utils.path_manager import VAL_YF_DIR, VAL_YF_STATIC
+
+
+HTTP_TIMEOUT_SEC = 20
+_MAC_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Playwright request filter shared by the Yahoo Finance scrapers: only the DOM is read, so visual
+# assets and ad/analytics traffic are dropped. Hosts are matched against the request's netloc.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "scorecardresearch.com",
+    "amazon-adsystem.com",
+    "adsrvr.org",
+    "criteo",
+    "taboola",
+)
+# For scrapers that split innerText on the rendered line breaks, which need the page CSS.
+_LAYOUT_RESOURCE_TYPES = BLOCKED_RESOURCE_TYPES - {"stylesheet"}
+
+
+async def _route_blocking(route, resource_types: FrozenSet[str]) -> None:
+    request = route.request
+    host = urlparse(request.url).netloc
+    if request.resource_type in resource_types or any(blocked in host for blocked in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def route_minimal_assets(route) -> None:
+    await _route_blocking(route, BLOCKED_RESOURCE_TYPES)
+
+
+async def route_minimal_assets_keep_css(route) -> None:
+    await _route_blocking(route, _LAYOUT_RESOURCE_TYPES)
+
+
+def _load_tickers_from_db(include_name: bool) -> Optional[List[Dict[str, str]]]:
+    try:
+        from src.utils.db_connector import get_active_tickers
+    except Exception:
+        return None
+
+    try:
+        rows = get_active_tickers("Yahoo Finance")
+        out = []
+        for row in rows:
+            ticker = str(row.get("ticker", "")).strip()
+            if not ticker:
+                continue
+            item = {"ticker": ticker}
+            if include_name:
+                item["name"] = str(row.get("name", "")).strip() or "N/A"
+            out.append(item)
+        return out
+    except Exception:
+        return None
+
+
+def _load_tickers_from_master(include_name: bool) -> List[Dict[str, str]]:
+    base = VAL_YF_DIR / "master_tickers"
+    if not base.exists():
+        return []
+
+    latest = max((d for d in base.iterdir() if d.is_dir()), key=lambda d: d.name, default=None)
+    if latest is None:
+        return []
+
+    master = latest / "yf_ticker.csv"
+    if not master.exists():
+        return []
+
+    try:
+        # Only ticker/name are needed, so the stdlib reader is enough and pandas stays unimported.
+        with master.open(encoding="utf-8-sig", newline="") as fh:
+            reader = csv.DictReader(fh)
+            if "ticker" not in (reader.fieldnames or []):
+                return []
+
+            out = []
+            for r in reader:
+                ticker = (r.get("ticker") or "").strip()
+                if not ticker:
+                    continue
+                item = {"ticker": ticker}
+                if include_name:
+                    item["name"] = (r.get("name") or "").strip() or "N/A"
+                out.append(item)
+            return out
+    except Exception:
+        return []
+
+
+def load_ticker_universe(include_name: bool = False) -> List[Dict[str, str]]:
+    from_db = _load_tickers_from_db(include_name)
+    if from_db is not None:
+        return from_db
+    return _load_tickers_from_master(include_name)
+
+
+def resolve_output_path(filename: str) -> Path:
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    out_dir = VAL_YF_STATIC / date_str
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / filename
+
+
+def get_processed_tickers(path: Path) -> set:
+    # Append-only sidecar of written tickers; the CSV is only parsed for outputs that predate it.
+    sidecar = path.with_suffix(".tickers.txt")
+    if sidecar.exists():
+        with sidecar.open(encoding="utf-8") as fh:
+            return {line.strip() for line in fh if line.strip()}
+    if not path.exists():
+        return set()
+    try:
+        with path.open(encoding="utf-8-sig", newline="") as fh:
+            processed = {(r.get("ticker") or "").strip() for r in csv.DictReader(fh)}
+        processed.discard("")
+    except Exception:
+        return set()
+
+    with sidecar.open("w", encoding="utf-8") as fh:
+        fh.writelines(f"{ticker}\n" for ticker in processed)
+    return processed
+
+
+def export_parquet(csv_path: Path, logger: logging.Logger) -> None:
+    # Columnar copy for downstream readers; the CSV stays the append/resume target.
+    try:
+        import pandas as pd
+
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        df.to_parquet(csv_path.with_suffix(".parquet"), compression="zstd", index=False)
+    except Exception as exc:
+        logger.warning("Parquet export skipped: %s", exc)
+
+
+def _csv_escape(value: str) -> str:
+    if any(ch in value for ch in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _csv_line(values: Iterable[str]) -> str:
+    # Every scraped value is already a string, so rows are formatted directly (csv-module dialect, CRLF).
+    return ",".join(map(_csv_escape, values)) + "\r\n"
+
+
+class StaticRowWriter:
+    # Append-only CSV output plus the .tickers.txt sidecar that get_processed_tickers reads on resume.
+    def __init__(self, path: Path, columns: List[str], flush_every: int = 50):
+        self.path = path
+        self.columns = columns
+        self.flush_every = flush_every
+
+        # Read before the handles below are opened, so a fresh sidecar is not mistaken for an empty run.
+        self.processed = get_processed_tickers(path)
+
+        # One append handle for the whole run; rows are flushed every flush_every so a crash loses little.
+        self._ticker_fh = path.with_suffix(".tickers.txt").open("a", encoding="utf-8")
+        self._fh = path.open("a", newline="", encoding="utf-8-sig")
+        if self._fh.tell() == 0:
+            self._fh.write(_csv_line(columns))
+            self._fh.flush()
+        self._written = 0
+
+    def write(self, row: Dict[str, str]) -> None:
+        self._fh.write(_csv_line(row.get(c, "") for c in self.columns))
+        self._ticker_fh.write(row["ticker"] + "\n")
+        self._written += 1
+        if self._written % self.flush_every == 0:
+            self._fh.flush()
+            self._ticker_fh.flush()
+
+    def close(self) -> None:
+        self._fh.flush()
+        self._fh.close()
+        self._ticker_fh.close()
+
+
+class StaticScraperBase:
+    # Shared lifecycle for the static identity/policy/risk scrapers: plain HTTP first, a pooled
+    # Playwright page only as fallback. Subclasses provide scrape_static/scrape_page and the settings below.
+    output_name = ""
+    columns: List[str] = []
+    flush_every = 50
+    include_name = False
+    user_agent = _MAC_USER_AGENT
+    route_handler = staticmethod(route_minimal_assets_keep_css)
+    # Upper bound for one browser fallback; None leaves it to the page's own goto/selector timeouts.
+    page_timeout_sec: Optional[float] = None
+    # Failed tickers still get an (empty) row so they are not retried on resume.
+    write_empty_rows = True
+    # Pause after every 10th ticker, and (if set) after every other one.
+    pause_every_10th: Tuple[float, float] = (2, 4)
+    pause_between: Optional[Tuple[float, float]] = None
+
+    def __init__(self, logger: logging.Logger, sample: int = 0, concurrency: int = 5):
+        self.logger = logger
+        self.output_file = resolve_output_path(self.output_name)
+        self.concurrency = max(1, concurrency)
+        # Stamped once per run rather than formatted for every ticker.
+        self._today = datetime.now().strftime("%Y-%m-%d")
+        self._completed = 0
+        self._total = 0
+        self.tickers = load_ticker_universe(include_name=self.include_name)
+        if sample > 0:
+            self.tickers = self.tickers[:sample]
+
+        self._out = StaticRowWriter(self.output_file, self.columns, flush_every=self.flush_every)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    # One pooled HTTP session per scraper instance, reused for every ticker; never open a session inside the scrape loop.
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 2, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=get_random_headers())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch_html(self, url: str) -> str:
+        try:
+            async with self._session.get(url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SEC)) as response:
+                if response.status == 200:
+                    return await response.text()
+        except Exception:
+            pass
+        return ""
+
+    def _empty_row(self, item: Dict[str, str]) -> Dict[str, str]:
+        row = {c: "" for c in self.columns}
+        row["ticker"] = item["ticker"]
+        if "updated_at" in row:
+            row["updated_at"] = self._today
+        return row
+
+    async def scrape_static(self, item: Dict[str, str]) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    async def scrape_page(self, page, item: Dict[str, str]) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    async def _scrape_one(self, sem: asyncio.Semaphore, page_pool: asyncio.Queue, i: int, item: Dict[str, str]) -> None:
+        async with sem:
+            ticker = item["ticker"]
+            result = await self.scrape_static(item)
+            if result is None:
+                page = await page_pool.get()
+                try:
+                    result = await asyncio.wait_for(self.scrape_page(page, item), timeout=self.page_timeout_sec)
+                except asyncio.TimeoutError:
+                    self.logger.warning("%s timeout > %ss", ticker, self.page_timeout_sec)
+                    result = None
+                finally:
+                    page_pool.put_nowait(page)
+
+            if result:
+                self._out.write(result)
+            elif self.write_empty_rows:
+                self._out.write(self._empty_row(item))
+
+            self._completed += 1
+            if self._completed % 100 == 0:
+                self.logger.info("Progress: %s/%s", self._completed, self._total)
+            if i % 10 == 0:
+                await asyncio.sleep(random.uniform(*self.pause_every_10th))
+            elif self.pause_between:
+                await asyncio.sleep(random.uniform(*self.pause_between))
+
+    async def run(self) -> None:
+        try:
+            await self._run()
+        finally:
+            self._out.close()
+            export_parquet(self.output_file, self.logger)
+
+    async def _run(self) -> None:
+        processed = self._out.processed
+        queue = [t for t in self.tickers if t["ticker"] not in processed]
+
+        self.logger.info("Universe=%s | Processed=%s | Remaining=%s", len(self.tickers), len(processed), len(queue))
+        if not queue:
+            self.logger.info("No new tickers to process")
+            return
+
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent=self.user_agent)
+            await context.route("**/*", self.route_handler)
+
+            self._total = len(queue)
+            # Warm pool of pages recycled between workers instead of a new_page() per ticker.
+            page_pool: asyncio.Queue = asyncio.Queue()
+            for _ in range(self.concurrency):
+                page_pool.put_nowait(await context.new_page())
+
+            sem = asyncio.Semaphore(self.concurrency)
+            outcomes = await asyncio.gather(
+                *(self._scrape_one(sem, page_pool, i, item) for i, item in enumerate(queue, 1)),
+                return_exceptions=True,
+            )
+            for item, outcome in zip(queue, outcomes):
+                if isinstance(outcome, Exception):
+                    self.logger.error("%s worker error: %s", item["ticker"], outcome)
+
+            await browser.close()
+
+        self.logger.info("Output: %s", self.output_file)
+
+
+async def _run_static_scraper(scraper_cls, sample: int, concurrency: int) -> None:
+    async with scraper_cls(sample=sample, concurrency=concurrency) as scraper:
+        await scraper.run()
+
+
+def run_static_scraper_cli(scraper_cls, description: str) -> None:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--sample", type=int, default=0, help="0 = all")
+    parser.add_argument("--concurrency", type=int, default=5, help="tickers scraped in parallel")
+    args = parser.parse_args()
+    asyncio.run(_run_static_scraper(scraper_cls, args.sample, args.concurrency))
@@ -1,5 +1,6 @@
 import argparse
 import asyncio
+import csv
 import random
 from datetime import datetime
 from pathlib import Path
@@ -8,6 +9,7 @@ from typing import Dict, List, Optional
 import pandas as pd
 from playwright.async_api import async_playwright
 
+from src.sites.Yahoo_Finance.yahoo_finance_static_common import route_minimal_assets
 from src.utils.logger import setup_logger
 from src.utils.path_manager import VAL_YF_DIR, VAL_YF_STATIC
 
@@ -25,6 +27,23 @@ COLS = [
     "holdings_turnover",
 ]
 
+FLUSH_EVERY = 50
+CONTENT_WAIT_MS = 5000
+
+# Only these ticker types have a /holdings page worth visiting.
+HOLDINGS_TICKER_TYPES = {"ETF", "FUND"}
+
+_TABLE_ROWS_JS = "() => Array.from(document.querySelectorAll('table tr'), (r) => Array.from(r.cells, (c) => c.innerText.trim()))"
+_HOLDINGS_PAGE_JS = """
+() => {
+    const header = document.querySelector('section[data-testid="top-holdings"] h3');
+    return {
+        header: header ? header.innerText : '',
+        rows: Array.from(document.querySelectorAll('table tr'), (r) => Array.from(r.cells, (c) => c.innerText.trim())),
+    };
+}
+"""
+
 
 def _load_tickers_from_db() -> Optional[List[Dict[str, str]]]:
     try:
@@ -34,7 +53,11 @@ def _load_tickers_from_db() -> Optional[List[Dict[str, str]]]:
 
     try:
         rows = get_active_tickers("Yahoo Finance")
-        return [{"ticker": str(r.get("ticker", "")).strip()} for r in rows if str(r.get("ticker", "")).strip()]
+        return [
+            {"ticker": str(r.get("ticker", "")).strip(), "ticker_type": str(r.get("asset_type") or "").strip()}
+            for r in rows
+            if str(r.get("ticker", "")).strip()
+        ]
     except Exception:
         return None
 
@@ -50,8 +73,17 @@ def _load_tickers_from_master() -> List[Dict[str, str]]:
     if not master.exists():
         return []
     try:
-        df = pd.read_csv(master, encoding="utf-8-sig")
-        return [{"ticker": str(t).strip()} for t in df["ticker"].dropna().tolist() if str(t).strip()]
+        parquet = master.with_suffix(".parquet")
+        if parquet.exists():
+            df = pd.read_parquet(parquet, columns=["ticker", "ticker_type"])
+        else:
+            df = pd.read_csv(master, usecols=["ticker", "ticker_type"], dtype=str, encoding="utf-8-sig", engine="pyarrow")
+        df = df.dropna(subset=["ticker"]).fillna({"ticker_type": ""})
+        return [
+            {"ticker": t.strip(), "ticker_type": tt.strip()}
+            for t, tt in zip(df["ticker"], df["ticker_type"])
+            if t.strip()
+        ]
     except Exception:
         return []
 
@@ -71,32 +103,87 @@ def resolve_output_path() -> Path:
 
 
 class YFFeesScraper:
-    def __init__(self, sample: int = 0):
+    def __init__(self, sample: int = 0, concurrency: int = 4):
         self.output_file = resolve_output_path()
-        self.tickers = get_ticker_universe()
+        self.concurrency = max(1, concurrency)
+        self.tickers = list({t["ticker"]: t for t in get_ticker_universe()}.values())
         if sample > 0:
             self.tickers = self.tickers[:sample]
 
-        if not self.output_file.exists():
-            pd.DataFrame(columns=COLS).to_csv(self.output_file, index=False, encoding="utf-8-sig")
+        # One append handle for the whole run instead of a to_csv open/close per ticker.
+        self._fp = self.output_file.open("a", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._fp, fieldnames=COLS)
+        if self._fp.tell() == 0:
+            self._writer.writeheader()
+            self._fp.flush()
+
+        self._buffer: List[Dict[str, str]] = []
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._completed = 0
+
+    def _write_rows(self, rows: List[Dict[str, str]]) -> None:
+        self._writer.writerows(rows)
+        self._fp.flush()
+
+    async def _drain_writes(self) -> None:
+        # Single consumer so file writes stay ordered and never run on the event loop thread.
+        while True:
+            rows = await self._write_queue.get()
+            if rows is None:
+                return
+            try:
+                await asyncio.to_thread(self._write_rows, rows)
+            except Exception as exc:
+                logger.error("write error: %s", exc)
+
+    async def aclose(self) -> None:
+        if self._buffer:
+            self._write_queue.put_nowait(self._buffer)
+            self._buffer = []
+        self._write_queue.put_nowait(None)
+        await self._writer_task
+        self._fp.close()
+
+    def _record(self, result: Dict[str, str]) -> None:
+        self._buffer.append(result)
+        if len(self._buffer) >= FLUSH_EVERY:
+            self._write_queue.put_nowait(self._buffer)
+            self._buffer = []
+
+    async def _scrape_one(self, page_pool: asyncio.Queue, item: Dict[str, str]) -> None:
+        page = await page_pool.get()
+        try:
+            result = await self.scrape_data(page, item["ticker"], item.get("ticker_type", ""))
+            if result:
+                self._record(result)
+
+            self._completed += 1
+            if self._completed % 10 == 0:
+                await asyncio.sleep(random.uniform(2, 4))
+        finally:
+            page_pool.put_nowait(page)
+
+    @staticmethod
+    async def _wait_for(page, selector: str) -> None:
+        # Returns as soon as the content renders; tickers without the table just time out and parse what is there.
+        try:
+            await page.wait_for_selector(selector, timeout=CONTENT_WAIT_MS)
+        except Exception:
+            pass
 
-    async def scrape_data(self, page, ticker: str) -> Optional[Dict[str, str]]:
+    async def scrape_data(self, page, ticker: str, ticker_type: str = "") -> Optional[Dict[str, str]]:
         data = {c: "" for c in COLS}
         data["ticker"] = ticker
 
         try:
             await page.goto(f"https://finance.yahoo.com/quote/{ticker}/profile", wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(2)
+            await self._wait_for(page, "table tr")
 
-            rows = await page.locator("table tr").all()
-            for row in rows:
-                text = await row.inner_text()
-                if "\t" not in text:
-                    continue
-                parts = text.split("\t")
-                if len(parts) < 2:
+            # One evaluate for the whole table instead of an inner_text round-trip per row.
+            for cells in await page.evaluate(_TABLE_ROWS_JS):
+                if len(cells) < 2:
                     continue
-                label, value = parts[0].strip(), parts[1].strip()
+                label, value = cells[0], cells[1]
                 if value == "--":
                     continue
 
@@ -111,24 +198,23 @@ class YFFeesScraper:
                 elif "Turnover" in label:
                     data["holdings_turnover"] = value
 
+            # Non-funds, or profiles with neither expense ratio nor net assets, have no holdings to read.
+            if (ticker_type and ticker_type.upper() not in HOLDINGS_TICKER_TYPES) or not (data["expense_ratio"] or data["assets_aum"]):
+                logger.info("%s extracted (profile only)", ticker)
+                return data
+
             await page.goto(f"https://finance.yahoo.com/quote/{ticker}/holdings", wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(2)
+            await self._wait_for(page, "table tr, section[data-testid='top-holdings']")
 
-            try:
-                header = await page.locator('section[data-testid="top-holdings"] h3').first.inner_text()
-                if "(" in header and "%" in header:
-                    data["top_10_hold_pct"] = header.split("(")[1].split("%")[0].strip() + "%"
-            except Exception:
-                pass
-
-            holdings_rows = await page.locator("table tr").all()
-            for row in holdings_rows:
-                text = await row.inner_text()
-                if "\t" not in text:
-                    continue
-                parts = text.split("\t")
-                if len(parts) >= 2 and "Total Holdings" in parts[0]:
-                    data["holdings_count"] = parts[1].strip()
+            # Header and table rows in one round-trip; a missing header no longer waits out a locator timeout.
+            holdings = await page.evaluate(_HOLDINGS_PAGE_JS)
+            header = holdings["header"]
+            if "(" in header and "%" in header:
+                data["top_10_hold_pct"] = header.split("(")[1].split("%")[0].strip() + "%"
+
+            for cells in holdings["rows"]:
+                if len(cells) >= 2 and "Total Holdings" in cells[0]:
+                    data["holdings_count"] = cells[1]
 
             logger.info("%s extracted", ticker)
             return data
@@ -137,7 +223,16 @@ class YFFeesScraper:
             return None
 
     async def run(self) -> None:
-        processed = set(pd.read_csv(self.output_file, usecols=["ticker"], encoding="utf-8-sig")["ticker"].astype(str)) if self.output_file.exists() else set()
+        self._writer_task = asyncio.create_task(self._drain_writes())
+        try:
+            await self._run()
+        finally:
+            await self.aclose()
+
+    async def _run(self) -> None:
+        processed = set(
+            pd.read_csv(self.output_file, usecols=["ticker"], dtype={"ticker": str}, encoding="utf-8-sig", engine="pyarrow")["ticker"]
+        )
         queue = [t for t in self.tickers if t["ticker"] not in processed]
 
         logger.info("Universe=%s | Processed=%s | Remaining=%s", len(self.tickers), len(processed), len(queue))
@@ -153,17 +248,16 @@ class YFFeesScraper:
                     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
                 )
             )
-            page = await context.new_page()
-
-            for i, item in enumerate(queue, 1):
-                result = await self.scrape_data(page, item["ticker"])
-                if result:
-                    pd.DataFrame([result])[COLS].to_csv(self.output_file, mode="a", header=False, index=False, encoding="utf-8-sig")
+            await context.route("**/*", route_minimal_assets)
 
-                if i % 10 == 0:
-                    await asyncio.sleep(random.uniform(2, 4))
+            page_pool: asyncio.Queue = asyncio.Queue()
+            for _ in range(min(self.concurrency, len(queue))):
+                page_pool.put_nowait(await context.new_page())
 
-            await browser.close()
+            try:
+                await asyncio.gather(*(self._scrape_one(page_pool, item) for item in queue))
+            finally:
+                await browser.close()
 
         logger.info("Output: %s", self.output_file)
 
@@ -171,8 +265,9 @@ class YFFeesScraper:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Yahoo Finance static fees scraper")
     parser.add_argument("--sample", type=int, default=0, help="0 = all")
+    parser.add_argument("--concurrency", type=int, default=4, help="pages scraped in parallel")
     args = parser.parse_args()
-    asyncio.run(YFFeesScraper(sample=args.sample).run())
+    asyncio.run(YFFeesScraper(sample=args.sample, concurrency=args.concurrency).run())
 
 
 if __name__ == "__main__":
@@ -1,30 +1,23 @@
-import argparse
 import asyncio
-import random
 import sys
-from datetime import datetime
-from pathlib import Path
 from typing import Dict, List, Optional
 
-import pandas as pd
-from playwright.async_api import async_playwright
+from selectolax.parser import HTMLParser
 
+from src.sites.Yahoo_Finance.yahoo_finance_static_common import StaticScraperBase, run_static_scraper_cli
 from src.utils.logger import setup_logger
-from src.utils.path_manager import VAL_YF_DIR, VAL_YF_STATIC
 
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
-async def _route_minimal_assets(route):
-    if route.request.resource_type in {"image", "font", "media"}:
-        await route.abort()
-    else:
-        await route.continue_()
+logger = setup_logger("03_static_yf_risk")
 
+RISK_TABLE_SELECTOR = 'section[data-testid="risk-statistics-table"]'
+RATING_ROW_SELECTOR = 'section[data-testid="risk-overview"] tr'
 
-logger = setup_logger("03_static_yf_risk")
+_TABLE_CELLS_JS = "(sel) => Array.from(document.querySelectorAll(sel), (tr) => Array.from(tr.querySelectorAll('td'), (td) => td.innerText.trim()))"
 
 METRICS = [
     "alpha",
@@ -36,106 +29,107 @@ METRICS = [
     "treynor_ratio",
 ]
 
+# Table label ("r squared", "sharpe ratio", ...) -> metric key, one dict probe per row.
+_METRIC_LOOKUP = {m.replace("_", " "): m for m in METRICS}
+
 COLS = ["ticker", "morningstar_rating"]
 for metric in METRICS:
     for horizon in ["3y", "5y", "10y"]:
         COLS.append(f"{metric}_{horizon}")
 
 
-def _load_tickers_from_db() -> Optional[List[Dict[str, str]]]:
-    try:
-        from src.utils.db_connector import get_active_tickers
-    except Exception:
-        return None
-
-    try:
-        rows = get_active_tickers("Yahoo Finance")
-        return [{"ticker": str(r.get("ticker", "")).strip()} for r in rows if str(r.get("ticker", "")).strip()]
-    except Exception:
-        return None
-
-
-def _load_tickers_from_master() -> List[Dict[str, str]]:
-    base = VAL_YF_DIR / "master_tickers"
-    if not base.exists():
-        return []
-    date_dirs = sorted([d for d in base.iterdir() if d.is_dir()])
-    if not date_dirs:
-        return []
-    master = date_dirs[-1] / "yf_ticker.csv"
-    if not master.exists():
-        return []
-    try:
-        df = pd.read_csv(master, encoding="utf-8-sig")
-        return [{"ticker": str(t).strip()} for t in df["ticker"].dropna().tolist() if str(t).strip()]
-    except Exception:
-        return []
-
-
-def get_ticker_universe() -> List[Dict[str, str]]:
-    from_db = _load_tickers_from_db()
-    if from_db is not None:
-        return from_db
-    return _load_tickers_from_master()
-
-
-def resolve_output_path() -> Path:
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    out_dir = VAL_YF_STATIC / date_str
-    out_dir.mkdir(parents=True, exist_ok=True)
-    return out_dir / "yahoo_finance_risk.csv"
-
-
-class YFRiskScraper:
-    def __init__(self, sample: int = 0):
-        self.output_file = resolve_output_path()
-        self.tickers = get_ticker_universe()
-        if sample > 0:
-            self.tickers = self.tickers[:sample]
-
-        if not self.output_file.exists():
-            pd.DataFrame(columns=COLS).to_csv(self.output_file, index=False, encoding="utf-8-sig")
-
-    async def scrape_risk(self, page, ticker: str) -> Optional[Dict[str, str]]:
-        data = {c: "" for c in COLS}
-        data["ticker"] = ticker
+def _apply_risk_matrix(data: Dict[str, str], matrix: List[List[str]]) -> int:
+    # Returns how many mapped risk metrics were filled.
+    filled = 0
+    for cells in matrix:
+        cell_count = len(cells)
+        if cell_count < 2:
+            continue
+
+        metric = _METRIC_LOOKUP.get(cells[0].lower().replace("-", " ").strip())
+        if metric is None:
+            continue
+
+        data[f"{metric}_3y"] = cells[1]
+        data[f"{metric}_5y"] = cells[3] if cell_count > 3 else ""
+        data[f"{metric}_10y"] = cells[5] if cell_count > 5 else ""
+        filled += 1
+    return filled
+
+
+def _apply_rating(data: Dict[str, str], raw_rating: str) -> None:
+    stars = raw_rating.count("★")
+    if stars:
+        data["morningstar_rating"] = str(stars)
+    elif raw_rating.isdigit():
+        data["morningstar_rating"] = raw_rating
+
+
+def _parse_risk_html(html: str, data: Dict[str, str]) -> bool:
+    tree = HTMLParser(html)
+    rows = tree.css(f"{RISK_TABLE_SELECTOR} tbody tr")
+    if not rows:
+        return False
+
+    filled = _apply_risk_matrix(data, [[td.text().strip() for td in row.css("td")] for row in rows])
+
+    for row in tree.css(RATING_ROW_SELECTOR):
+        if "Morningstar Risk Rating" in row.text():
+            cells = row.css("td")
+            if cells:
+                _apply_rating(data, cells[-1].text().strip())
+            break
+    # An empty risk table is not a static hit; the ticker then gets the Playwright fallback.
+    return filled > 0
+
+
+class YFRiskScraper(StaticScraperBase):
+    output_name = "yahoo_finance_risk.csv"
+    columns = COLS
+    flush_every = 100
+    page_timeout_sec = 80
+    pause_every_10th = (3, 6)
+    pause_between = (1, 2)
+
+    def __init__(self, sample: int = 0, concurrency: int = 5):
+        super().__init__(logger, sample=sample, concurrency=concurrency)
+
+    # Plain HTTP first; a browser page is only opened when the risk table is not in the static HTML.
+    async def scrape_static(self, item: Dict[str, str]) -> Optional[Dict[str, str]]:
+        ticker = item["ticker"]
+        html = await self._fetch_html(f"https://finance.yahoo.com/quote/{ticker}/risk")
+        if not html:
+            return None
+
+        data = self._empty_row(item)
+        try:
+            if not _parse_risk_html(html, data):
+                return None
+        except Exception:
+            return None
+
+        logger.info("%s extracted static (rating=%s)", ticker, data.get("morningstar_rating", ""))
+        return data
+
+    async def scrape_page(self, page, item: Dict[str, str]) -> Optional[Dict[str, str]]:
+        ticker = item["ticker"]
+        data = self._empty_row(item)
 
         try:
             await page.goto(f"https://finance.yahoo.com/quote/{ticker}/risk", wait_until="domcontentloaded", timeout=60000)
 
-            target = 'section[data-testid="risk-statistics-table"]'
             try:
-                await page.wait_for_selector(target, timeout=20000)
+                await page.wait_for_selector(RISK_TABLE_SELECTOR, timeout=20000)
             except Exception:
                 return None
 
-            await asyncio.sleep(2)
-
-            rows = page.locator(f"{target} tbody tr")
-            count = await rows.count()
-            for i in range(count):
-                cells = rows.nth(i).locator("td")
-                cell_count = await cells.count()
-                if cell_count < 2:
-                    continue
-
-                label = (await cells.nth(0).inner_text()).lower().strip()
-
-                for metric in METRICS:
-                    metric_label = metric.replace("_", " ")
-                    if metric_label in label or (metric == "beta" and label == "beta"):
-                        data[f"{metric}_3y"] = (await cells.nth(1).inner_text()).strip() if cell_count > 1 else ""
-                        data[f"{metric}_5y"] = (await cells.nth(3).inner_text()).strip() if cell_count > 3 else ""
-                        data[f"{metric}_10y"] = (await cells.nth(5).inner_text()).strip() if cell_count > 5 else ""
+            # All cell texts in one evaluate instead of a CDP round-trip per row and cell.
+            _apply_risk_matrix(data, await page.evaluate(_TABLE_CELLS_JS, f"{RISK_TABLE_SELECTOR} tbody tr"))
 
             try:
-                rating_row = page.locator('section[data-testid="risk-overview"] tr:has-text("Morningstar Risk Rating")')
+                rating_row = page.locator(f'{RATING_ROW_SELECTOR}:has-text("Morningstar Risk Rating")')
                 if await rating_row.count() > 0:
-                    raw_rating = (await rating_row.locator("td").last.inner_text()).strip()
-                    if "★" in raw_rating:
-                        data["morningstar_rating"] = str(raw_rating.count("★"))
-                    elif raw_rating.isdigit():
-                        data["morningstar_rating"] = raw_rating
+                    _apply_rating(data, (await rating_row.locator("td").last.inner_text()).strip())
             except Exception:
                 pass
 
@@ -145,56 +139,9 @@ class YFRiskScraper:
             logger.error("%s error: %s", ticker, str(exc))
             return None
 
-    async def run(self) -> None:
-        processed = set(pd.read_csv(self.output_file, usecols=["ticker"], encoding="utf-8-sig")["ticker"].astype(str)) if self.output_file.exists() else set()
-        queue = [t for t in self.tickers if t["ticker"] not in processed]
-
-        logger.info("Universe=%s | Processed=%s | Remaining=%s", len(self.tickers), len(processed), len(queue))
-        if not queue:
-            logger.info("No new tickers to process")
-            return
-
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
-            )
-            page = await context.new_page()
-            await context.route("**/*", _route_minimal_assets)
-
-            for i, item in enumerate(queue, 1):
-                try:
-                    result = await asyncio.wait_for(self.scrape_risk(page, item["ticker"]), timeout=80)
-                except asyncio.TimeoutError:
-                    logger.warning("%s timeout > 80s", item["ticker"])
-                    result = None
-                row = result if result else {c: "" for c in COLS}
-                row["ticker"] = item["ticker"]
-                pd.DataFrame([row])[COLS].to_csv(self.output_file, mode="a", header=False, index=False, encoding="utf-8-sig")
-
-                if i % 25 == 0:
-                    await page.close()
-                    page = await context.new_page()
-                if i % 10 == 0:
-                    await asyncio.sleep(random.uniform(3, 6))
-                else:
-                    await asyncio.sleep(random.uniform(1, 2))
-                if i % 100 == 0:
-                    logger.info("Progress: %s/%s", i, len(queue))
-
-            await browser.close()
-
-        logger.info("Output: %s", self.output_file)
-
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Yahoo Finance static risk scraper")
-    parser.add_argument("--sample", type=int, default=0, help="0 = all")
-    args = parser.parse_args()
-    asyncio.run(YFRiskScraper(sample=args.sample).run())
+    run_static_scraper_cli(YFRiskScraper, "Yahoo Finance static risk scraper")
 
 
 if __name__ == "__main__":
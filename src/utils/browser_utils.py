@@ -1,6 +1,8 @@
 import asyncio
+import itertools
 import random
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
 
 
 USER_AGENTS = [
@@ -22,13 +24,11 @@ USER_AGENTS = [
 ]
 
 
-def get_random_user_agent() -> str:
-    return random.choice(USER_AGENTS)
-
+# Shuffled once per process, then rotated: no per-call random draw and UAs are spread evenly.
+_UA_CYCLE = itertools.cycle(random.sample(USER_AGENTS, len(USER_AGENTS)))
 
-def get_random_headers() -> Dict[str, str]:
-    return {
-        "User-Agent": get_random_user_agent(),
+_BASE_HEADERS = MappingProxyType(
+    {
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.9",
         "Accept-Encoding": "gzip, deflate, br",
@@ -39,6 +39,15 @@ def get_random_headers() -> Dict[str, str]:
         "Sec-Fetch-Site": "none",
         "Sec-Fetch-User": "?1",
     }
+)
+
+
+def get_random_user_agent() -> str:
+    return next(_UA_CYCLE)
+
+
+def get_random_headers() -> Dict[str, str]:
+    return {"User-Agent": next(_UA_CYCLE), **_BASE_HEADERS}
 
 
 def get_launch_args(headless: bool = False) -> Dict[str, Any]:
@@ -69,11 +78,53 @@ def get_context_options() -> Dict[str, Any]:
     }
 
 
+_shared_playwright: Any = None
+_shared_browser: Any = None
+
+
+# One Chromium per process/event loop: scrapers open their own contexts on it
+# and the entrypoint calls close_shared_browser() once when the loop is done.
+async def get_shared_browser(headless: bool = True, args: Optional[List[str]] = None) -> Any:
+    global _shared_playwright, _shared_browser
+
+    if _shared_browser is not None and _shared_browser.is_connected():
+        return _shared_browser
+
+    if _shared_playwright is None:
+        from playwright.async_api import async_playwright
+
+        _shared_playwright = await async_playwright().start()
+
+    _shared_browser = await _shared_playwright.chromium.launch(headless=headless, args=args or [])
+    return _shared_browser
+
+
+async def close_shared_browser() -> None:
+    global _shared_playwright, _shared_browser
+
+    if _shared_browser is not None:
+        try:
+            await _shared_browser.close()
+        except Exception:
+            pass
+        _shared_browser = None
+
+    if _shared_playwright is not None:
+        try:
+            await _shared_playwright.stop()
+        except Exception:
+            pass
+        _shared_playwright = None
+
+
 async def human_sleep(min_sec: float = 1.0, max_sec: float = 3.0) -> None:
     await asyncio.sleep(random.uniform(min_sec, max_sec))
 
 
-async def human_mouse_move(page: Any) -> None:
+async def human_mouse_move(page: Any, *, headless: bool = False) -> None:
+    # Nobody sees the cursor in a headless run; skip the CDP mouse traffic.
+    if headless:
+        return
     try:
         viewport = page.viewport_size or {"width": 1366, "height": 768}
         width, height = viewport["width"], viewport["height"]
@@ -86,7 +137,11 @@ async def human_mouse_move(page: Any) -> None:
         return
 
 
-async def mimic_reading(page: Any, min_sec: float = 2, max_sec: float = 5) -> None:
+async def mimic_reading(page: Any, min_sec: float = 2, max_sec: float = 5, *, headless: bool = False) -> None:
+    # Headless runs keep only the settle delay; mouse moves and wheel scrolls add nothing there.
+    if headless:
+        await human_sleep(min_sec, max_sec)
+        return
     await human_mouse_move(page)
     await page.mouse.wheel(0, random.randint(100, 500))
     await asyncio.sleep(random.uniform(0.5, 1.5))
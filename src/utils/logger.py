@@ -1,7 +1,10 @@
+import atexit
 import logging
+import queue
 import sys
 import time
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -21,13 +24,31 @@ LOG_CATEGORY_MAP = {
     "99_sys": "99_system_maintenance",
 }
 
+# Longest prefix first, so a more specific prefix wins if one ever nests inside another.
+_PREFIXES = sorted(LOG_CATEGORY_MAP.items(), key=lambda kv: -len(kv[0]))
+
+# One background listener per configured logger; handlers write off the caller's thread.
+_LISTENERS: Dict[str, QueueListener] = {}
+
+
+def _stop_listeners() -> None:
+    for listener in _LISTENERS.values():
+        listener.stop()
+    _LISTENERS.clear()
+
+
+atexit.register(_stop_listeners)
+
 
 def setup_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
-    category_folder = "general"
-    for prefix, folder_name in LOG_CATEGORY_MAP.items():
-        if name.startswith(prefix):
-            category_folder = folder_name
-            break
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+
+    # Already configured (module re-import or a second caller): reuse it instead of reopening the files.
+    if name in _LISTENERS and logger.handlers:
+        return logger
+
+    category_folder = next((folder for prefix, folder in _PREFIXES if name.startswith(prefix)), "general")
 
     target_log_dir = LOG_DIR / category_folder
     target_log_dir.mkdir(parents=True, exist_ok=True)
@@ -36,11 +57,10 @@ def setup_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     log_file_path = target_log_dir / f"{name}_{today}.log"
     error_file_path = target_log_dir / f"{name}_{today}_error.log"
 
-    logger = logging.getLogger(name)
-    logger.setLevel(log_level)
-
-    if logger.hasHandlers():
+    if logger.handlers:
         logger.handlers.clear()
+    if name in _LISTENERS:
+        _LISTENERS.pop(name).stop()
 
     formatter = logging.Formatter(
         "%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s",
@@ -50,17 +70,21 @@ def setup_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
 
     error_handler = logging.FileHandler(error_file_path, encoding="utf-8")
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
-    logger.addHandler(error_handler)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
-    logger.addHandler(console_handler)
+
+    # Log calls only enqueue; file and console writes happen on the listener thread.
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, error_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    _LISTENERS[name] = listener
 
     return logger
 
@@ -1,72 +1,124 @@
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import functools
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Union
 
 
 STATUS_NEW = "new"
 STATUS_ACTIVE = "active"
 STATUS_INACTIVE = "inactive"
 
+# Bind values for the :*_status placeholders in the get_sql_* statements.
+SQL_STATUS_PARAMS = {
+    "new_status": STATUS_NEW,
+    "active_status": STATUS_ACTIVE,
+    "inactive_status": STATUS_INACTIVE,
+}
+
 INACTIVE_THRESHOLD_DAYS = 7
+_INACTIVE_DELTA = timedelta(days=INACTIVE_THRESHOLD_DAYS)
+
+# Placeholder names that do not count as a real name; stored lower-cased, compared after one lower().
+_NAME_SENTINELS = frozenset({"", "none", "nan", "n/a"})
+
+# Shape a last_seen string must have to be compared (YYYY-MM-DD, ASCII digits only).
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+# Tables the get_sql_* builders may target; table names cannot be bound, so they are whitelisted instead.
+_ALLOWED_TABLES = frozenset({"stg_security_master"})
+
+
+# Cutoff string per calendar day (ordinal): same-day calls are a cache hit instead of datetime math + strftime.
+@functools.lru_cache(maxsize=32)
+def _cutoff_for(ordinal: int) -> str:
+    cutoff = date.fromordinal(ordinal) - _INACTIVE_DELTA
+    return f"{cutoff.year:04d}-{cutoff.month:02d}-{cutoff.day:02d}"
+
+
+def get_inactive_cutoff_date(reference_date: Optional[date] = None) -> str:
+    return _cutoff_for((reference_date or date.today()).toordinal())
+
+
+def determine_initial_status(ticker: str, name: str, source: str) -> str:
+    # Every newly seen ticker starts as "new", named or not; promotion to active is a separate step
+    # (should_promote_to_active / the merge transitions) so validation lives in one place.
+    return STATUS_NEW
+
+
+def should_promote_to_active(row_data: Dict[str, Any]) -> bool:
+    ticker = row_data.get("ticker")
+    name = row_data.get("name")
+    if not ticker or not name:
+        return False
+
+    # Values are almost always str already; only non-str values pay for a str() conversion.
+    # The ticker only needs a non-blank check, which isspace() answers without building a stripped copy.
+    ticker_text = ticker if isinstance(ticker, str) else str(ticker)
+    if not ticker_text or ticker_text.isspace():
+        return False
+    name_text = name.strip() if isinstance(name, str) else str(name).strip()
+    return name_text.lower() not in _NAME_SENTINELS
+
+
+def should_mark_inactive(last_seen_str: Union[str, date, None], reference_date: Optional[date] = None) -> bool:
+    if not last_seen_str:
+        return True
+
+    # The cutoff follows reference_date (default: today) on every call, so a worker running past midnight moves with it.
+    ordinal = (reference_date or date.today()).toordinal()
+
+    # DB drivers hand back date objects for DATE columns; compare those as day ordinals (a single int compare).
+    if isinstance(last_seen_str, date):
+        return last_seen_str.toordinal() < ordinal - INACTIVE_THRESHOLD_DAYS
+
+    # Shape guard instead of a try/except; a well-formed YYYY-MM-DD then orders lexicographically.
+    if not _ISO_DATE_RE.fullmatch(last_seen_str):
+        return False
+
+    return last_seen_str < _cutoff_for(ordinal)
+
+
+def _check_table(table_name: str) -> None:
+    if table_name not in _ALLOWED_TABLES:
+        raise ValueError(f"Unknown status table: {table_name!r}")
+
+
+# SQL text is built once per table; statuses are bound (see SQL_STATUS_PARAMS) so the statement text never varies.
+@functools.lru_cache(maxsize=8)
+def get_sql_update_inactive(table_name: str = "stg_security_master") -> str:
+    _check_table(table_name)
+    return f"""
+        UPDATE {table_name}
+        SET
+            status = :inactive_status,
+            updated_at = NOW()
+        WHERE
+            status = :active_status
+            AND last_seen < CURRENT_DATE - INTERVAL {INACTIVE_THRESHOLD_DAYS} DAY
+    """
+
+
+@functools.lru_cache(maxsize=8)
+def get_sql_promote_new_to_active(table_name: str = "stg_security_master") -> str:
+    _check_table(table_name)
+    return f"""
+        UPDATE {table_name}
+        SET
+            status = :active_status,
+            updated_at = NOW()
+        WHERE
+            status = :new_status
+            AND name IS NOT NULL
+            AND name != ''
+            AND name != 'N/A'
+    """
 
 
+# Compatibility shim for StatusManager.<name>(...) callers; new code should import the functions directly.
 class StatusManager:
-    @staticmethod
-    def get_inactive_cutoff_date(reference_date: Optional[datetime] = None) -> str:
-        if reference_date is None:
-            reference_date = datetime.now()
-
-        cutoff_date = reference_date - timedelta(days=INACTIVE_THRESHOLD_DAYS)
-        return cutoff_date.strftime("%Y-%m-%d")
-
-    @staticmethod
-    def determine_initial_status(ticker: str, name: str, source: str) -> str:
-        if not name or name.strip() == "" or name.lower() == "nan":
-            return STATUS_NEW
-        return STATUS_NEW
-
-    @staticmethod
-    def should_promote_to_active(row_data: Dict[str, Any]) -> bool:
-        ticker = row_data.get("ticker")
-        name = row_data.get("name")
-
-        has_ticker = ticker and str(ticker).strip() != ""
-        has_name = name and str(name).strip() not in ["", "None", "NaN", "N/A"]
-        return bool(has_ticker and has_name)
-
-    @staticmethod
-    def should_mark_inactive(last_seen_str: str) -> bool:
-        if not last_seen_str:
-            return True
-
-        try:
-            last_seen = datetime.strptime(last_seen_str, "%Y-%m-%d")
-            cutoff_date = datetime.now() - timedelta(days=INACTIVE_THRESHOLD_DAYS)
-            return last_seen < cutoff_date
-        except ValueError:
-            return False
-
-    @staticmethod
-    def get_sql_update_inactive(table_name: str = "stg_security_master") -> str:
-        return f"""
-            UPDATE {table_name}
-            SET
-                status = '{STATUS_INACTIVE}',
-                updated_at = NOW()
-            WHERE
-                status = '{STATUS_ACTIVE}'
-                AND last_seen < :cutoff_date
-        """
-
-    @staticmethod
-    def get_sql_promote_new_to_active(table_name: str = "stg_security_master") -> str:
-        return f"""
-            UPDATE {table_name}
-            SET
-                status = '{STATUS_ACTIVE}',
-                updated_at = NOW()
-            WHERE
-                status = '{STATUS_NEW}'
-                AND name IS NOT NULL
-                AND name != ''
-                AND name != 'N/A'
-        """
+    get_inactive_cutoff_date = staticmethod(get_inactive_cutoff_date)
+    determine_initial_status = staticmethod(determine_initial_status)
+    should_promote_to_active = staticmethod(should_promote_to_active)
+    should_mark_inactive = staticmethod(should_mark_inactive)
+    get_sql_update_inactive = staticmethod(get_sql_update_inactive)
+    get_sql_promote_new_to_active = staticmethod(get_sql_promote_new_to_active)